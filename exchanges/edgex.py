@@ -215,7 +215,8 @@ class EdgeXClient(BaseExchangeClient):
                                     'size': order.get('size'),
                                     'price': order.get('price'),
                                     'contract_id': order.get('contractId'),
-                                    'filled_size': filled_size
+                                    'filled_size': filled_size,
+                                    'client_order_id': order.get('clientOrderId')
                                 })
 
             except Exception as e:
@@ -569,5 +570,6 @@ class EdgeXClient(BaseExchangeClient):
             raise ValueError(f"Order quantity is less than min quantity: {self.config.quantity} < {min_quantity}")
 
         self.config.tick_size = Decimal(current_contract.get('tickSize'))
+        self.config.step_size = Decimal(current_contract.get('stepSize'))
 
         return self.config.contract_id, self.config.tick_size
@@ -90,6 +90,7 @@ class ExtendedClient(BaseExchangeClient):
         # Initialize logger using the same format as helpers
         self.logger = TradingLogger(exchange="extended", ticker=self.config.ticker, log_to_console=True)
         self._order_update_handler = None
+        self._orderbook_handler = None
 
         self.orderbook = None
         
@@ -164,6 +165,7 @@ class ExtendedClient(BaseExchangeClient):
             # 5. Reset internal state
             self.orderbook = None
             self._order_update_handler = None
+            self._orderbook_handler = None
             
             self.logger.log("Extended exchange disconnected successfully", "INFO")
             
@@ -683,6 +685,10 @@ class ExtendedClient(BaseExchangeClient):
     def setup_order_update_handler(self, handler) -> None:
         """Setup order update handler for WebSocket."""
         self._order_update_handler = handler
+
+    def setup_orderbook_handler(self, handler) -> None:
+        """Setup a handler that also receives every parsed orderbook stream message."""
+        self._orderbook_handler = handler
                 
     async def handle_orderbook(self, message):
         """Handle orderbook updates from WebSocket using correct pattern."""
@@ -693,6 +699,9 @@ class ExtendedClient(BaseExchangeClient):
             if isinstance(message, str):
                 message = json.loads(message)
 
+            if self._orderbook_handler:
+                self._orderbook_handler(message)
+
             # Check if this is a orderbook update
             event = message.get("type", "")
             if event == "SNAPSHOT":
@@ -743,6 +752,7 @@ class ExtendedClient(BaseExchangeClient):
         # Check if config quantity is less than min order size
         min_quantity = Decimal(str(market_information.data[0].trading_config.min_order_size))
         self.min_order_size = min_quantity
+        self.min_order_size_change = Decimal(str(market_information.data[0].trading_config.min_order_size_change))
         if self.config.quantity < min_quantity:
             self.logger.log(f"Order quantity is less than min quantity: {self.config.quantity} < {min_quantity}", "ERROR")
             raise ValueError(f"Order quantity is less than min quantity: {self.config.quantity} < {min_quantity}")
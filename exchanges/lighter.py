@@ -27,6 +27,38 @@ root_logger = logging.getLogger()
 if root_logger.level == logging.DEBUG:
     root_logger.setLevel(logging.WARNING)
 
+# Powers of ten for Lighter's size/price decimals (multiplier lookups on setup)
+_POW10 = {i: 10 ** i for i in range(19)}
+
+
+def patch_lighter_api_client():
+    """Patch Lighter SDK ApiClient to decode REST responses with orjson when it is installed."""
+    try:
+        import json
+        import orjson
+        from lighter import api_client as lighter_api_client
+    except ImportError:
+        # orjson not available, keep the SDK's stdlib json decoding
+        return
+
+    class _OrjsonModule:
+        """Stands in for the json module inside lighter.api_client; only loads() is swapped."""
+
+        def __getattr__(self, name):
+            return getattr(json, name)
+
+        @staticmethod
+        def loads(s, **kwargs):
+            if kwargs:
+                return json.loads(s, **kwargs)
+            return orjson.loads(s)
+
+    if not isinstance(getattr(lighter_api_client, 'json', None), _OrjsonModule):
+        lighter_api_client.json = _OrjsonModule()
+
+
+patch_lighter_api_client()
+
 
 class LighterClient(BaseExchangeClient):
     """Lighter exchange client implementation."""
@@ -58,6 +90,8 @@ class LighterClient(BaseExchangeClient):
         self.base_amount_multiplier = None
         self.price_multiplier = None
         self.orders_cache = {}
+        # ticker -> (market_id, size_decimals, price_decimals, tick_size); market metadata is static per run
+        self._contract_cache = {}
         self.current_order_client_id = None
         self.current_order = None
         
@@ -90,8 +124,8 @@ class LighterClient(BaseExchangeClient):
             for market in order_books.order_books:
                 if market.symbol == ticker:
                     market_id = market.market_id
-                    base_multiplier = pow(10, market.supported_size_decimals)
-                    price_multiplier = pow(10, market.supported_price_decimals)
+                    base_multiplier = _POW10[market.supported_size_decimals]
+                    price_multiplier = _POW10[market.supported_price_decimals]
 
                     # Store market info for later use
                     self.config.market_info = market
@@ -626,12 +660,26 @@ class LighterClient(BaseExchangeClient):
 
         self.current_order = None
         self.current_order_client_id = None
-        order_price = await self.get_order_price(direction)
 
-        order_price = self.round_to_tick(order_price)
-        
-        # Use retry mechanism for nonce errors
+        # Use retry mechanism for nonce errors (and for missing bid/ask below)
         max_retries = 3
+
+        # Invalid/missing bid/ask raises ValueError; back off exponentially instead of failing the open
+        backoff = 0.5
+        for attempt in range(max_retries):
+            try:
+                order_price = await self.get_order_price(direction)
+                break
+            except ValueError as e:
+                if attempt == max_retries - 1:
+                    raise
+                self.logger.log(f"[OPEN] No valid bid/ask ({e}), retrying in {backoff}s "
+                                f"({attempt + 1}/{max_retries})", "WARNING")
+                await asyncio.sleep(backoff)
+                backoff *= 2
+
+        order_price = self.round_to_tick(order_price)
+
         order_result = None
         for attempt in range(max_retries):
             try:
@@ -750,18 +798,24 @@ class LighterClient(BaseExchangeClient):
             order_book = await order_api.order_book_orders(market_id=market_id, limit=limit)
             
             # Log order book info
-            self.logger.log(f"=== ORDER BOOK API (Top {limit}) ===", "INFO")
+            debug_enabled = self.logger.logger.isEnabledFor(logging.DEBUG)
+            if debug_enabled:
+                self.logger.log(f"=== ORDER BOOK API (Top {limit}) ===", "DEBUG")
             
             # Get best bid and ask from API
             if order_book.bids and len(order_book.bids) > 0:
                 best_bid_api = Decimal(order_book.bids[0].price)
-                self.logger.log(f"API Best Bid: {best_bid_api} (amount: {order_book.bids[0].remaining_base_amount})", "INFO")
+                if debug_enabled:
+                    self.logger.log(f"API Best Bid: {best_bid_api} "
+                                    f"(amount: {order_book.bids[0].remaining_base_amount})", "DEBUG")
             else:
                 best_bid_api = None
                 
             if order_book.asks and len(order_book.asks) > 0:
                 best_ask_api = Decimal(order_book.asks[0].price)
-                self.logger.log(f"API Best Ask: {best_ask_api} (amount: {order_book.asks[0].remaining_base_amount})", "INFO")
+                if debug_enabled:
+                    self.logger.log(f"API Best Ask: {best_ask_api} "
+                                    f"(amount: {order_book.asks[0].remaining_base_amount})", "DEBUG")
             else:
                 best_ask_api = None
                 
@@ -778,17 +832,21 @@ class LighterClient(BaseExchangeClient):
         # Get current market prices from WebSocket order book
         best_bid_ws, best_ask_ws = await self.fetch_bbo_prices(self.config.contract_id)
         
+        # Per-quote market data logs are DEBUG only; skip formatting entirely when disabled
+        debug_enabled = self.logger.logger.isEnabledFor(logging.DEBUG)
+
         # Use API data if available, otherwise fall back to WebSocket
         if best_bid_api and best_ask_api:
             best_bid = best_bid_api
             best_ask = best_ask_api
-            self.logger.log("Using order book data from API", "INFO")
+            if debug_enabled:
+                self.logger.log("Using order book data from API", "DEBUG")
         else:
             best_bid = best_bid_ws
             best_ask = best_ask_ws
             self.logger.log("Falling back to WebSocket order book data", "WARNING")
         
-        if best_bid <= 0 or best_ask <= 0 or best_bid >= best_ask:
+        if best_bid is None or best_ask is None or best_bid <= 0 or best_ask <= 0 or best_bid >= best_ask:
             self.logger.log("Invalid bid/ask prices", "ERROR")
             raise ValueError("Invalid bid/ask prices")
 
@@ -796,34 +854,39 @@ class LighterClient(BaseExchangeClient):
         spread = best_ask - best_bid
         spread_percent = (spread / best_bid) * 100
         mid_price = (best_bid + best_ask) / 2
-        self.logger.log(f"=== MARKET DATA ===", "INFO")
-        self.logger.log(f"Best Bid (WS): {best_bid_ws} | Best Bid (API): {best_bid_api}", "INFO")
-        self.logger.log(f"Best Ask (WS): {best_ask_ws} | Best Ask (API): {best_ask_api}", "INFO")
-        self.logger.log(f"Using - Bid: {best_bid}, Ask: {best_ask}", "INFO")
-        self.logger.log(f"Spread: {spread} ({spread_percent:.4f}%)", "INFO")
-        self.logger.log(f"Mid Price: {mid_price}", "INFO")
+        if debug_enabled:
+            self.logger.log("=== MARKET DATA ===", "DEBUG")
+            self.logger.log(f"Best Bid (WS): {best_bid_ws} | Best Bid (API): {best_bid_api}", "DEBUG")
+            self.logger.log(f"Best Ask (WS): {best_ask_ws} | Best Ask (API): {best_ask_api}", "DEBUG")
+            self.logger.log(f"Using - Bid: {best_bid}, Ask: {best_ask}", "DEBUG")
+            self.logger.log(f"Spread: {spread} ({spread_percent:.4f}%)", "DEBUG")
+            self.logger.log(f"Mid Price: {mid_price}", "DEBUG")
 
         # Use mid price for more reasonable pricing
         # If spread is too large (>5%), it indicates order book issue
         if spread_percent > 5:
             self.logger.log(f"WARNING: Large spread detected ({spread_percent:.2f}%), using mid price", "WARNING")
             order_price = mid_price
-            self.logger.log(f"Using mid price for {side} order: {order_price}", "INFO")
+            if debug_enabled:
+                self.logger.log(f"Using mid price for {side} order: {order_price}", "DEBUG")
         else:
             # Normal spread - use conservative pricing
             if side.lower() == 'buy':
                 # For buy orders, use best bid (more conservative)
                 order_price = best_bid
-                self.logger.log(f"BUY order using best_bid: {order_price}", "INFO")
+                if debug_enabled:
+                    self.logger.log(f"BUY order using best_bid: {order_price}", "DEBUG")
             else:
                 # For sell orders, use best ask (more conservative)
                 order_price = best_ask
-                self.logger.log(f"SELL order using best_ask: {order_price}", "INFO")
+                if debug_enabled:
+                    self.logger.log(f"SELL order using best_ask: {order_price}", "DEBUG")
 
-        # Round to tick size
-        if hasattr(self, 'config') and hasattr(self.config, 'tick_size'):
+        # Round to tick size (tick_size is populated by get_contract_attributes)
+        if self.config.tick_size:
             order_price = self.round_to_tick(order_price)
-            self.logger.log(f"After rounding to tick: {order_price}", "INFO")
+            if debug_enabled:
+                self.logger.log(f"After rounding to tick: {order_price}", "DEBUG")
 
         # Check existing close orders to avoid conflicts
         active_orders = await self.get_active_orders(self.config.contract_id)
@@ -834,8 +897,9 @@ class LighterClient(BaseExchangeClient):
             else:
                 order_price = max(order_price, order.price + self.config.tick_size)
 
-        self.logger.log(f"Final order price: {order_price}", "INFO")
-        self.logger.log(f"==================", "INFO")
+        if debug_enabled:
+            self.logger.log(f"Final order price: {order_price}", "DEBUG")
+            self.logger.log("==================", "DEBUG")
         return order_price
 
     async def cancel_order(self, order_id: str, max_retries: int = 3) -> OrderResult:
@@ -844,13 +908,19 @@ class LighterClient(BaseExchangeClient):
         if self.lighter_client is None:
             await self._initialize_lighter_client()
 
+        # Parse once up front rather than on every retry
+        try:
+            order_index = int(order_id)
+        except (TypeError, ValueError):
+            return OrderResult(success=False, error_message=f"Invalid order id: {order_id}")
+
         last_error = None
         for attempt in range(max_retries):
             try:
                 # Cancel order using official SDK
                 cancel_order, tx_hash, error = await self.lighter_client.cancel_order(
                     market_index=self.config.contract_id,
-                    order_index=int(order_id)
+                    order_index=order_index
                 )
 
                 if error is not None:
@@ -880,15 +950,21 @@ class LighterClient(BaseExchangeClient):
     async def get_order_info(self, order_id: str) -> Optional[OrderInfo]:
         """Get order information from Lighter using API query."""
         try:
-            self.logger.log(f"[API] get_order_info called for order_id={order_id}", "INFO")
+            debug_enabled = self.logger.logger.isEnabledFor(logging.DEBUG)
+            if debug_enabled:
+                self.logger.log(f"[API] get_order_info called for order_id={order_id}", "DEBUG")
             
             # First try WebSocket current_order for recent orders
             if hasattr(self, 'current_order') and self.current_order:
-                self.logger.log(f"[API] current_order exists: order_id={self.current_order.order_id}, client_order_index={self.current_order.client_order_index}, status={self.current_order.status}", "INFO")
+                if debug_enabled:
+                    self.logger.log(f"[API] current_order exists: order_id={self.current_order.order_id}, "
+                                    f"client_order_index={self.current_order.client_order_index}, "
+                                    f"status={self.current_order.status}", "DEBUG")
                 
                 # Check if this is the order we're looking for (match by client_order_index)
                 if self.current_order.client_order_index and str(self.current_order.client_order_index) == str(order_id):
-                    self.logger.log(f"[API] client_order_index match! Returning current_order", "INFO")
+                    if debug_enabled:
+                        self.logger.log("[API] client_order_index match! Returning current_order", "DEBUG")
                     # If it's finalized but filled_size looks missing, pull from inactive orders for authoritative fill
                     if str(self.current_order.status).upper() in ["CANCELED", "FILLED"] and (self.current_order.filled_size is None or Decimal(self.current_order.filled_size) == 0):
                         finalized = await self.get_finalized_order_from_api(str(order_id), max_pages=5)
@@ -897,7 +973,8 @@ class LighterClient(BaseExchangeClient):
                     return self.current_order
                 # Fallback: also check order_id (long ID)
                 elif str(self.current_order.order_id) == str(order_id):
-                    self.logger.log(f"[API] order_id match! Returning current_order", "INFO")
+                    if debug_enabled:
+                        self.logger.log("[API] order_id match! Returning current_order", "DEBUG")
                     if str(self.current_order.status).upper() in ["CANCELED", "FILLED"] and (self.current_order.filled_size is None or Decimal(self.current_order.filled_size) == 0):
                         finalized = await self.get_finalized_order_from_api(str(order_id), max_pages=5)
                         if finalized is not None:
@@ -905,14 +982,17 @@ class LighterClient(BaseExchangeClient):
                     return self.current_order
             
             # If not found in current_order, query API for all active orders
-            self.logger.log(f"[API] Order not found in current_order, querying API...", "INFO")
+            if debug_enabled:
+                self.logger.log("[API] Order not found in current_order, querying API...", "DEBUG")
             try:
                 active_orders = await self.get_active_orders(self.config.contract_id)
                 for order in active_orders:
                     # Check both order_id and client_order_index
                     if (str(order.order_id) == str(order_id) or 
-                        (hasattr(order, 'client_order_index') and order.client_order_index and str(order.client_order_index) == str(order_id))):
-                        self.logger.log(f"[API] Found order in API: order_id={order.order_id}, status={order.status}, filled={order.filled_size}", "INFO")
+                        (order.client_order_index and str(order.client_order_index) == str(order_id))):
+                        if debug_enabled:
+                            self.logger.log(f"[API] Found order in API: order_id={order.order_id}, "
+                                            f"status={order.status}, filled={order.filled_size}", "DEBUG")
                         # If finalized and filled looks zero, try inactive orders for final numbers
                         if str(order.status).upper() in ["CANCELED", "FILLED"] and (order.filled_size is None or Decimal(order.filled_size) == 0):
                             finalized = await self.get_finalized_order_from_api(str(order_id), max_pages=5)
@@ -973,31 +1053,23 @@ class LighterClient(BaseExchangeClient):
             self.logger.log("Failed to get active orders, API returned None", "WARNING")
             return []
 
-        # Filter orders for the specific market
-        contract_orders = []
-        seen_ids = set()
-        for order in order_list:
-            # Convert Lighter Order to OrderInfo
-            side = "sell" if order.is_ask else "buy"
-            size = Decimal(order.initial_base_amount)
-            price = Decimal(order.price)
-
-            # Only include orders with remaining size > 0 AND valid active status
-            order_status = getattr(order, 'status', 'UNKNOWN').upper()
-            # Only include OPEN or PARTIALLY_FILLED orders (exclude CANCELED, FILLED, etc.)
-            if size > 0 and order_status in ['OPEN', 'PARTIALLY_FILLED']:
-                oi = OrderInfo(
-                    order_id=str(order.order_index),
-                    side=side,
-                    size=Decimal(order.remaining_base_amount),  # Use remaining size for active orders
-                    price=price,
-                    status=order_status,
-                    filled_size=Decimal(order.filled_base_amount),
-                    remaining_size=Decimal(order.remaining_base_amount),
-                    client_order_index=getattr(order, 'client_order_index', None)  # Add client_order_index
-                )
-                contract_orders.append(oi)
-                seen_ids.add(str(order.order_index))
+        # Convert Lighter Orders to OrderInfo, keeping only OPEN / PARTIALLY_FILLED orders with size > 0
+        D = Decimal
+        OI = OrderInfo
+        active_statuses = ('OPEN', 'PARTIALLY_FILLED')
+        contract_orders = [
+            OI(order_id=str(o.order_index),
+               side="sell" if o.is_ask else "buy",
+               size=(remaining := D(o.remaining_base_amount)),  # Use remaining size for active orders
+               price=D(o.price),
+               status=status,
+               filled_size=D(o.filled_base_amount),
+               remaining_size=remaining,
+               client_order_index=o.client_order_index)
+            for o in order_list
+            if (status := o.status.upper()) in active_statuses and D(o.initial_base_amount) > 0
+        ]
+        seen_ids = {oi.order_id for oi in contract_orders}
 
         # Merge in WebSocket-cached OPEN orders to mitigate API lag
         try:
@@ -1093,8 +1165,11 @@ class LighterClient(BaseExchangeClient):
             return None
 
     @query_retry(reraise=True, max_attempts=3, min_wait=2, max_wait=30)
-    async def _fetch_positions_with_retry(self) -> List[Dict[str, Any]]:
-        """Get positions using official SDK."""
+    async def _fetch_positions_with_retry(self) -> Tuple[List[Any], Dict[int, Any]]:
+        """Get positions using official SDK.
+
+        Returns the raw position list and the same positions keyed by market_id.
+        """
         try:
             # Use shared API client
             account_api = lighter.AccountApi(self.api_client)
@@ -1112,7 +1187,7 @@ class LighterClient(BaseExchangeClient):
             # Return positions from the first account
             positions = account_data.accounts[0].positions
             self.logger.log(f"Found {len(positions)} positions", "DEBUG")
-            return positions
+            return positions, {int(p.market_id): p for p in positions}
             
         except Exception as e:
             error_str = str(e)
@@ -1138,20 +1213,20 @@ class LighterClient(BaseExchangeClient):
             self.last_position_query_time = time.time()
             
             # Get account info which includes positions
-            positions = await self._fetch_positions_with_retry()
+            _, positions_by_market = await self._fetch_positions_with_retry()
 
             # Find position for current market
-            for position in positions:
-                if position.market_id == int(self.config.contract_id):
-                    # Convert position string to Decimal
-                    # position.sign: 1 for Long, -1 for Short
-                    # position.position: the amount of position
-                    position_amount = Decimal(position.position)
-                    if position.sign == -1:  # Short position
-                        position_amount = -position_amount
-                    return position_amount
-
-            return Decimal(0)
+            position = positions_by_market.get(int(self.config.contract_id))
+            if position is None:
+                return Decimal(0)
+
+            # Convert position string to Decimal
+            # position.sign: 1 for Long, -1 for Short
+            # position.position: the amount of position
+            position_amount = Decimal(position.position)
+            if position.sign == -1:  # Short position
+                position_amount = -position_amount
+            return position_amount
         except Exception as e:
             self.logger.log(f"Error getting account positions: {e}", "ERROR")
             return Decimal(0)
@@ -1163,38 +1238,48 @@ class LighterClient(BaseExchangeClient):
             self.logger.log("Ticker is empty", "ERROR")
             raise ValueError("Ticker is empty")
 
-        order_api = lighter.OrderApi(self.api_client)
-        # Get all order books to find the market for our ticker
-        order_books = await order_api.order_books()
-
-        # Find the market that matches our ticker
-        market_info = None
-        for market in order_books.order_books:
-            if market.symbol == ticker:
-                market_info = market
-                break
+        cached = self._contract_cache.get(ticker)
+        if cached is None:
+            order_api = lighter.OrderApi(self.api_client)
+            # Get all order books to find the market for our ticker
+            order_books = await order_api.order_books()
 
-        if market_info is None:
-            self.logger.log("Failed to get markets", "ERROR")
-            raise ValueError("Failed to get markets")
+            # Find the market that matches our ticker
+            market_info = None
+            for market in order_books.order_books:
+                if market.symbol == ticker:
+                    market_info = market
+                    break
 
-        market_summary = await order_api.order_book_details(market_id=market_info.market_id)
-        order_book_details = market_summary.order_book_details[0]
-        # Set contract_id to market name (Lighter uses market IDs as identifiers)
-        self.config.contract_id = market_info.market_id
-        self.base_amount_multiplier = pow(10, market_info.supported_size_decimals)
-        self.price_multiplier = pow(10, market_info.supported_price_decimals)
+            if market_info is None:
+                self.logger.log("Failed to get markets", "ERROR")
+                raise ValueError("Failed to get markets")
 
-        try:
-            self.config.tick_size = Decimal("1") / (Decimal("10") ** order_book_details.price_decimals)
-        except Exception:
-            self.logger.log("Failed to get tick size", "ERROR")
-            raise ValueError("Failed to get tick size")
+            market_summary = await order_api.order_book_details(market_id=market_info.market_id)
+            order_book_details = market_summary.order_book_details[0]
+
+            try:
+                tick_size = Decimal("1") / (Decimal("10") ** order_book_details.price_decimals)
+            except Exception:
+                self.logger.log("Failed to get tick size", "ERROR")
+                raise ValueError("Failed to get tick size")
+
+            cached = (market_info.market_id, market_info.supported_size_decimals,
+                      market_info.supported_price_decimals, tick_size)
+            self._contract_cache[ticker] = cached
+
+        market_id, size_decimals, price_decimals, tick_size = cached
+        # Set contract_id to market name (Lighter uses market IDs as identifiers)
+        self.config.contract_id = market_id
+        self.base_amount_multiplier = _POW10[size_decimals]
+        self.price_multiplier = _POW10[price_decimals]
+        self.config.tick_size = tick_size
 
         return self.config.contract_id, self.config.tick_size
 
     def round_to_tick(self, price: Decimal) -> Decimal:
         """Round price to tick size."""
-        if hasattr(self, 'config') and hasattr(self.config, 'tick_size') and self.config.tick_size:
-            return (price / self.config.tick_size).quantize(Decimal('1')) * self.config.tick_size
+        tick_size = self.config.tick_size
+        if tick_size:
+            return (price / tick_size).quantize(Decimal('1')) * tick_size
         return price
@@ -1,32 +1,46 @@
 import asyncio
-import json
 import signal
 import logging
 import os
 import sys
 import time
-import requests
+import queue
 import argparse
 import traceback
 import csv
-from decimal import Decimal
+import itertools
+from collections import deque
+from decimal import Decimal, ROUND_HALF_UP
+from logging.handlers import QueueHandler, QueueListener
+from types import SimpleNamespace
 from typing import Tuple
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _root not in sys.path:
+    sys.path.insert(0, _root)
 
 from exchanges.edgex import EdgeXClient
 from exchanges.bybit import BybitClient
+from helpers.log_formatter import CachedTimeFormatter
 import websockets
 from datetime import datetime
 import pytz
 
-class Config:
-    """Simple config class to wrap dictionary for exchange clients."""
-    def __init__(self, config_dict):
-        for key, value in config_dict.items():
-            setattr(self, key, value)
+
+class OrderSlot:
+    """Reusable order record handed out from a per-exchange free list instead of a fresh dict."""
+
+    __slots__ = ('order_id', 'side', 'price', 'quantity', 'filled')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.order_id = None
+        self.side = None
+        self.price = None
+        self.quantity = None
+        self.filled = False
 
 
 class HedgeBot:
@@ -38,14 +52,21 @@ class HedgeBot:
         self.fill_timeout = fill_timeout
         self.bybit_order_filled = False
         self.iterations = iterations
-        self.edgex_position = Decimal('0')
-        self.bybit_position = Decimal('0')
+        # Positions are ints in EdgeX size units (see _sz_scale); converted to Decimal only for output
+        self.edgex_position = 0
+        self.bybit_position = 0
+        # Integer scales set from contract info in trading_loop; order size string formatted once
+        self._px_scale = 1
+        self._sz_scale = 1
+        self._qty_int = 0
+        self._qty_str = str(order_quantity)
         self.current_order = {}
 
         # Initialize logging to file
         os.makedirs("logs", exist_ok=True)
         self.log_filename = f"logs/edgex_{ticker}_hedge_mode_log.txt"
         self.csv_filename = f"logs/edgex_{ticker}_hedge_mode_trades.csv"
+        self._csv_is_new = not os.path.exists(self.csv_filename)
         self.original_stdout = sys.stdout
 
         # Initialize logger
@@ -70,53 +91,146 @@ class HedgeBot:
         if hasattr(sys.stdout, 'reconfigure'):
             sys.stdout.reconfigure(encoding='utf-8')
 
-        # Create different formatters for file and console
-        file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        console_formatter = logging.Formatter('%(levelname)s:%(name)s:%(message)s')
+        # One formatter for file and console; both handlers run on this bot's listener thread
+        formatter = CachedTimeFormatter('%(asctime)s %(levelname)s %(message)s')
+        file_handler.setFormatter(formatter)
+        console_handler.setFormatter(formatter)
 
-        file_handler.setFormatter(file_formatter)
-        console_handler.setFormatter(console_formatter)
+        # HEDGE_QUIET=1 drops the console handler (file log only)
+        handlers = [file_handler]
+        if not os.getenv('HEDGE_QUIET'):
+            handlers.append(console_handler)
 
-        # Add handlers to logger
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # Only a QueueHandler sits on the logger; a background QueueListener thread owns the
+        # file/console handlers so the event loop never blocks on disk or stdout writes
+        self._log_queue = queue.Queue(-1)
+        self.logger.addHandler(QueueHandler(self._log_queue))
+        self._log_listener = QueueListener(self._log_queue, *handlers, respect_handler_level=True)
+        self._log_listener.start()
 
         # Prevent propagation to root logger to avoid duplicate messages
         self.logger.propagate = False
+        # Per-frame debug logs in the WS handlers check this instead of calling logger.debug;
+        # refreshed by set_log_level
+        self._debug_on = self.logger.isEnabledFor(logging.DEBUG)
 
         # State management
         self.stop_flag = False
+        # Set by shutdown() to cut inter-iteration pauses short
+        self._stop_event = asyncio.Event()
         self.edgex_client = None
         self.bybit_client = None
         self.edgex_ws = None
         self.bybit_ws = None
-        self.edgex_order_book = {"bids": [], "asks": []}
-        self.bybit_order_book = {"bids": [], "asks": []}
+        # Event loop the EdgeX SDK's WebSocket thread hands order updates back to (set in setup_edgex_websocket)
+        self._loop: asyncio.AbstractEventLoop | None = None
         self.edgex_orders = {}
         self.bybit_orders = {}
+
+        # Pre-allocated order slots reused across iterations (see acquire/release_order_slot)
+        self._edgex_pool = [OrderSlot() for _ in range(4)]
+        self._edgex_free = list(self._edgex_pool)
+        self._bybit_pool = [OrderSlot() for _ in range(4)]
+        self._bybit_free = list(self._bybit_pool)
+
+        # EdgeX order id -> event set by the order-update handler once the order is FILLED
+        self._edgex_fill_events: dict[str, asyncio.Event] = {}
         self.trade_count = 0
-        self.total_pnl = Decimal('0')
-        self.start_time = None
+        self.total_pnl = 0  # in EdgeX price unit * size unit, see pnl_to_decimal
+        self.start_time = None  # time.monotonic_ns() when the trading loop starts
+        self._oid_counter = itertools.count(1)
+
+        # Static format string for the per-iteration log line
+        self._iter_fmt = "📊 Starting iteration %d/%d"
 
         # CSV file setup
         self.setup_csv_logging()
 
-        # Setup signal handlers
-        self.setup_signal_handlers()
-
     def setup_csv_logging(self):
-        """Setup CSV logging for trades."""
-        csv_exists = os.path.exists(self.csv_filename)
-        with open(self.csv_filename, 'a', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['timestamp', 'ticker', 'side', 'edgex_price', 'bybit_price', 'quantity', 'pnl', 'total_pnl']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            if not csv_exists:
-                writer.writeheader()
-
-    def setup_signal_handlers(self):
-        """Setup signal handlers for graceful shutdown."""
-        signal.signal(signal.SIGINT, self.shutdown)
-        signal.signal(signal.SIGTERM, self.shutdown)
+        """Setup CSV logging for trades.
+
+        The file stays open for the bot's lifetime; trade rows are queued in memory and
+        written in batches by _csv_flusher (group commit: one write + fsync per batch).
+        """
+        self._csv_fh = open(self.csv_filename, 'a', newline='', buffering=1 << 16, encoding='utf-8')
+        self._csv_writer = csv.writer(self._csv_fh)
+        if self._csv_is_new:
+            self._csv_writer.writerow(['timestamp', 'ticker', 'side', 'edgex_price', 'bybit_price',
+                                       'quantity', 'pnl', 'total_pnl'])
+            self._csv_fh.flush()
+        self._csv_queue = deque()
+
+    def pnl_to_decimal(self, pnl_units: int) -> Decimal:
+        """Convert an integer PnL (price unit * size unit) back to quote currency."""
+        return Decimal(pnl_units) / (self._px_scale * self._sz_scale)
+
+    def trade_pnl(self, edgex_order, hedge_order) -> int:
+        """PnL of one hedged round in price unit * size unit; 0 until both legs carry a price."""
+        if not edgex_order.price or not hedge_order.price:
+            return 0
+        px_scale = self._px_scale
+        edgex_px = int((Decimal(edgex_order.price) * px_scale).to_integral_value(rounding=ROUND_HALF_UP))
+        hedge_px = int((Decimal(hedge_order.price) * px_scale).to_integral_value(rounding=ROUND_HALF_UP))
+        spread = hedge_px - edgex_px if edgex_order.side == "buy" else edgex_px - hedge_px
+        return spread * self._qty_int
+
+    def log_trade_to_csv(self, edgex_order, hedge_order, pnl: int = 0):
+        """Queue a completed hedge trade for the CSV flusher (no I/O on the trading path)."""
+        self._csv_queue.append([
+            datetime.now(pytz.UTC).isoformat(),
+            self.ticker,
+            edgex_order.side,
+            edgex_order.price,
+            hedge_order.price or "",
+            edgex_order.quantity,
+            self.pnl_to_decimal(pnl),
+            self.pnl_to_decimal(self.total_pnl)
+        ])
+
+    def flush_csv(self):
+        """Write all queued trade rows in one batch and fsync once."""
+        if not self._csv_queue:
+            return
+        rows = []
+        while self._csv_queue:
+            rows.append(self._csv_queue.popleft())
+        self._csv_writer.writerows(rows)
+        self._csv_fh.flush()
+        os.fsync(self._csv_fh.fileno())
+
+    async def _csv_flusher(self, interval: float = 0.5):
+        """Background task draining the trade queue every `interval` seconds."""
+        while not self.stop_flag:
+            await asyncio.sleep(interval)
+            try:
+                self.flush_csv()
+            except Exception as e:
+                self.logger.error("Failed to write trades to CSV: %s", e)
+
+    @staticmethod
+    def acquire_order_slot(free_list) -> OrderSlot:
+        """Take a slot from a free list, allocating only if the pool is exhausted."""
+        return free_list.pop() if free_list else OrderSlot()
+
+    @staticmethod
+    def release_order_slot(free_list, slot: OrderSlot):
+        """Reset a slot and return it to its free list."""
+        slot.reset()
+        free_list.append(slot)
+
+    def set_log_level(self, level: int):
+        """Change the bot logger level and refresh the cached debug flag."""
+        self.logger.setLevel(level)
+        self._debug_on = self.logger.isEnabledFor(logging.DEBUG)
+
+    def setup_signal_handlers(self, loop: asyncio.AbstractEventLoop):
+        """Setup signal handlers for graceful shutdown, run on the event loop where supported."""
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.shutdown)
+            except NotImplementedError:
+                # Windows event loops have no add_signal_handler
+                signal.signal(sig, self.shutdown)
 
     def initialize_edgex_client(self):
         """Initialize the EdgeX client."""
@@ -136,10 +250,12 @@ class HedgeBot:
                 'base_url': base_url,
                 'ws_url': ws_url,
                 'account_id': account_id,
-                'stark_private_key': stark_private_key
+                'stark_private_key': stark_private_key,
+                'quantity': self.order_quantity,
+                'close_order_side': 'sell'  # EdgeX orders are opened as buys
             }
 
-            self.edgex_client = EdgeXClient(Config(config))
+            self.edgex_client = EdgeXClient(SimpleNamespace(**config))
             self.logger.info("✅ EdgeX client initialized successfully")
 
     def initialize_bybit_client(self):
@@ -161,17 +277,17 @@ class HedgeBot:
                 'testnet': testnet
             }
 
-            self.bybit_client = BybitClient(Config(config))
+            self.bybit_client = BybitClient(SimpleNamespace(**config))
             self.logger.info("✅ Bybit client initialized successfully")
 
-    async def get_edgex_contract_info(self):
-        """Get EdgeX contract information."""
+    async def get_edgex_contract_info(self) -> Tuple[str, Decimal, Decimal]:
+        """Get EdgeX contract ID, tick size and size step from the exchange metadata."""
         try:
-            # This would need to be implemented based on EdgeX API
-            # For now, return placeholder values
-            return "SOL-PERP", Decimal('0.01'), Decimal('0.1')
+            # Sets the numeric contract id the order-update handler filters on
+            contract_id, tick_size = await self.edgex_client.get_contract_attributes()
+            return contract_id, tick_size, self.edgex_client.config.step_size
         except Exception as e:
-            self.logger.error(f"Failed to get EdgeX contract info: {e}")
+            self.logger.error("Failed to get EdgeX contract info: %s", e)
             raise
 
     async def get_bybit_contract_info(self):
@@ -181,16 +297,21 @@ class HedgeBot:
             # For now, return placeholder values
             return "SOLUSDT", Decimal('0.01'), Decimal('0.1')
         except Exception as e:
-            self.logger.error(f"Failed to get Bybit contract info: {e}")
+            self.logger.error("Failed to get Bybit contract info: %s", e)
             raise
 
     async def setup_edgex_websocket(self):
         """Setup EdgeX WebSocket connection."""
         try:
-            # This would need to be implemented based on EdgeX WebSocket API
+            # Order updates feed wait_for_edgex_fill; the client filters them on the numeric
+            # config.contract_id resolved by get_edgex_contract_info
+            self._loop = asyncio.get_running_loop()
+            self.edgex_client.setup_order_update_handler(self.handle_edgex_order_update)
+            await self.edgex_client.connect()
+            self.edgex_ws = self.edgex_client
             self.logger.info("✅ EdgeX WebSocket connection established")
         except Exception as e:
-            self.logger.error(f"Could not setup EdgeX WebSocket handlers: {e}")
+            self.logger.error("Could not setup EdgeX WebSocket handlers: %s", e)
 
     async def setup_bybit_websocket(self):
         """Setup Bybit WebSocket connection."""
@@ -198,50 +319,70 @@ class HedgeBot:
             # This would need to be implemented based on Bybit WebSocket API
             self.logger.info("✅ Bybit WebSocket connection established")
         except Exception as e:
-            self.logger.error(f"Could not setup Bybit WebSocket handlers: {e}")
+            self.logger.error("Could not setup Bybit WebSocket handlers: %s", e)
 
     async def trading_loop(self):
         """Main trading loop implementing the hedge strategy."""
-        self.logger.info(f"🚀 Starting hedge bot for {self.ticker}")
+        self.logger.info("🚀 Starting hedge bot for %s", self.ticker)
 
-        # Initialize clients
+        # Bind logger methods once; they are called several times per iteration
+        logger = self.logger
+        info = logger.info
+        warn = logger.warning
+        err = logger.error
+        pause = self.wait_for_stop
+
+        # Initialize clients (both exchanges in parallel; client constructors may block on HTTP)
         try:
-            self.initialize_edgex_client()
-            self.initialize_bybit_client()
+            await asyncio.gather(
+                asyncio.to_thread(self.initialize_edgex_client),
+                asyncio.to_thread(self.initialize_bybit_client)
+            )
 
             # Get contract info
-            self.edgex_contract_id, self.edgex_tick_size, self.edgex_min_size = await self.get_edgex_contract_info()
-            self.bybit_contract_id, self.bybit_tick_size, self.bybit_min_size = await self.get_bybit_contract_info()
-
-            self.logger.info(f"Contract info loaded - EdgeX: {self.edgex_contract_id}, "
-                             f"Bybit: {self.bybit_contract_id}")
+            edgex_info, bybit_info = await asyncio.gather(self.get_edgex_contract_info(),
+                                                          self.get_bybit_contract_info())
+            self.edgex_contract_id, self.edgex_tick_size, self.edgex_step_size = edgex_info
+            self.bybit_contract_id, self.bybit_tick_size, self.bybit_min_size = bybit_info
+
+            # Hot-path arithmetic runs on ints: prices and sizes scaled by the decimals of the tick size and
+            # size step, so every valid price/quantity maps to an exact integer
+            self._px_scale = 10 ** max(0, -self.edgex_tick_size.as_tuple().exponent)
+            self._sz_scale = 10 ** max(0, -self.edgex_step_size.as_tuple().exponent)
+            if self.order_quantity % self.edgex_step_size:
+                warn("⚠️ Order quantity %s is not a multiple of the EdgeX size step %s",
+                     self.order_quantity, self.edgex_step_size)
+            self._qty_int = int((self.order_quantity * self._sz_scale).to_integral_value(rounding=ROUND_HALF_UP))
+
+            info("Contract info loaded - EdgeX: %s, Bybit: %s",
+                 self.edgex_contract_id, self.bybit_contract_id)
 
         except Exception as e:
-            self.logger.error(f"❌ Failed to initialize: {e}")
+            err("❌ Failed to initialize: %s", e)
             return
 
         # Setup WebSockets
         try:
-            await self.setup_edgex_websocket()
-            await self.setup_bybit_websocket()
-            self.logger.info("✅ WebSocket connections established")
+            await asyncio.gather(self.setup_edgex_websocket(), self.setup_bybit_websocket())
+            info("✅ WebSocket connections established")
 
         except Exception as e:
-            self.logger.error(f"❌ Failed to setup WebSockets: {e}")
+            err("❌ Failed to setup WebSockets: %s", e)
             return
 
         # Main trading loop
-        self.start_time = time.time()
+        self.start_time = time.monotonic_ns()
         iteration = 0
 
         while iteration < self.iterations and not self.stop_flag:
+            edgex_order = hedge_order = None
             try:
-                self.logger.info(f"📊 Starting iteration {iteration + 1}/{self.iterations}")
+                info(self._iter_fmt, iteration + 1, self.iterations)
 
                 # Place post-only order on EdgeX
                 edgex_order = await self.place_edgex_order()
                 if not edgex_order:
-                    self.logger.warning("⚠️ Failed to place EdgeX order, skipping iteration")
+                    warn("⚠️ Failed to place EdgeX order, skipping iteration")
                     iteration += 1
                     continue
 
@@ -251,25 +392,40 @@ class HedgeBot:
                     # Hedge with market order on Bybit
                     hedge_order = await self.place_bybit_hedge_order(edgex_order)
                     if hedge_order:
-                        self.logger.info("✅ Hedge completed successfully")
+                        info("✅ Hedge completed successfully")
                         self.trade_count += 1
+                        filled_qty = self._qty_int if edgex_order.side == "buy" else -self._qty_int
+                        self.edgex_position += filled_qty
+                        self.bybit_position -= filled_qty
+                        pnl = self.trade_pnl(edgex_order, hedge_order)
+                        self.total_pnl += pnl
+                        self.log_trade_to_csv(edgex_order, hedge_order, pnl)
                     else:
-                        self.logger.warning("⚠️ Hedge order failed")
+                        warn("⚠️ Hedge order failed")
                 else:
-                    self.logger.info("⏰ EdgeX order timed out, cancelling")
+                    info("⏰ EdgeX order timed out, cancelling")
                     await self.cancel_edgex_order(edgex_order)
 
                 iteration += 1
-                await asyncio.sleep(1)  # Brief pause between iterations
+                if await pause(1.0):  # Brief pause between iterations
+                    break
 
             except Exception as e:
-                self.logger.error(f"❌ Error in trading loop: {e}")
+                err("❌ Error in trading loop: %s", e)
                 iteration += 1
-                await asyncio.sleep(1)
+                if await pause(1.0):
+                    break
+            finally:
+                # Iteration done (hedged or cancelled): return order slots to their pools
+                if edgex_order is not None:
+                    self.release_order_slot(self._edgex_free, edgex_order)
+                if hedge_order is not None:
+                    self.release_order_slot(self._bybit_free, hedge_order)
 
         # Final summary
-        self.logger.info(f"🏁 Trading completed. Total trades: {self.trade_count}")
-        self.logger.info(f"💰 Total PnL: {self.total_pnl}")
+        info("🏁 Trading completed. Total trades: %d", self.trade_count)
+        info("💰 Total PnL: %s", self.pnl_to_decimal(self.total_pnl))
+        info("⏱️ Elapsed: %.3fs", (time.monotonic_ns() - self.start_time) / 1e9)
 
     async def place_edgex_order(self):
         """Place a post-only order on EdgeX."""
@@ -277,9 +433,15 @@ class HedgeBot:
             # This would need to be implemented based on EdgeX API
             self.logger.info("📝 Placing EdgeX post-only order...")
             # Placeholder implementation
-            return {"order_id": f"edgex_{int(time.time())}", "side": "buy", "price": "100.0", "quantity": str(self.order_quantity)}
+            order = self.acquire_order_slot(self._edgex_free)
+            order.order_id = f"edgex_{next(self._oid_counter)}_{time.monotonic_ns()}"
+            order.side = "buy"
+            order.price = "100.0"
+            order.quantity = self._qty_str
+            self._edgex_fill_events[order.order_id] = asyncio.Event()
+            return order
         except Exception as e:
-            self.logger.error(f"Failed to place EdgeX order: {e}")
+            self.logger.error("Failed to place EdgeX order: %s", e)
             return None
 
     async def place_bybit_hedge_order(self, edgex_order):
@@ -288,22 +450,51 @@ class HedgeBot:
             # This would need to be implemented based on Bybit API
             self.logger.info("🔄 Placing Bybit hedge order...")
             # Placeholder implementation
-            return {"order_id": f"bybit_{int(time.time())}", "side": "sell", "quantity": str(self.order_quantity)}
+            order = self.acquire_order_slot(self._bybit_free)
+            order.order_id = f"bybit_{int(time.time())}"
+            order.side = "sell"
+            order.quantity = self._qty_str
+            return order
         except Exception as e:
-            self.logger.error(f"Failed to place Bybit hedge order: {e}")
+            self.logger.error("Failed to place Bybit hedge order: %s", e)
             return None
 
+    def handle_edgex_order_update(self, order_data):
+        """Handle an EdgeX order update from WebSocket; wakes wait_for_edgex_fill on FILLED.
+
+        Called on the EdgeX SDK's WebSocket thread, so the event is set on the bot's loop.
+        Fill events are keyed by our client order id (edgex_N_ts), not the exchange order id.
+        """
+        if self._debug_on:
+            self.logger.debug("EdgeX order update: %s", order_data)
+        if str(order_data.get('status', '')).upper() != 'FILLED':
+            return
+        self._loop.call_soon_threadsafe(self._set_edgex_fill_event, str(order_data.get('client_order_id')))
+
+    def _set_edgex_fill_event(self, client_order_id: str):
+        """Wake wait_for_edgex_fill for the order with this client order id, if one is pending."""
+        event = self._edgex_fill_events.get(client_order_id)
+        if event is not None:
+            event.set()
+
     async def wait_for_edgex_fill(self, order):
         """Wait for EdgeX order to fill or timeout."""
+        event = self._edgex_fill_events.get(order.order_id)
+        if event is None:
+            self.logger.error("No fill event registered for EdgeX order %s", order.order_id)
+            return False
         try:
-            # This would need to be implemented based on EdgeX WebSocket
             self.logger.info("⏳ Waiting for EdgeX order fill...")
-            await asyncio.sleep(self.fill_timeout)
-            # Placeholder - assume filled for demo
+            await asyncio.wait_for(event.wait(), timeout=self.fill_timeout)
+            order.filled = True
             return True
+        except asyncio.TimeoutError:
+            return False
         except Exception as e:
-            self.logger.error(f"Error waiting for EdgeX fill: {e}")
+            self.logger.error("Error waiting for EdgeX fill: %s", e)
             return False
+        finally:
+            self._edgex_fill_events.pop(order.order_id, None)
 
     async def cancel_edgex_order(self, order):
         """Cancel EdgeX order."""
@@ -311,28 +502,42 @@ class HedgeBot:
             # This would need to be implemented based on EdgeX API
             self.logger.info("❌ Cancelling EdgeX order...")
         except Exception as e:
-            self.logger.error(f"Failed to cancel EdgeX order: {e}")
+            self.logger.error("Failed to cancel EdgeX order: %s", e)
+
+    async def wait_for_stop(self, timeout: float) -> bool:
+        """Sleep up to `timeout` seconds; return True as soon as shutdown is requested."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
 
     def shutdown(self, signum=None, frame=None):
         """Graceful shutdown handler."""
         self.stop_flag = True
-        self.logger.info("\n🛑 Stopping...")
+        if self._stop_event is not None:
+            self._stop_event.set()
+        info = self.logger.info
+        err = self.logger.error
+        info("\n🛑 Stopping...")
 
         # Close WebSocket connections
         if self.edgex_ws:
             try:
-                self.logger.info("🔌 EdgeX WebSocket will be disconnected")
+                info("🔌 EdgeX WebSocket will be disconnected")
             except Exception as e:
-                self.logger.error(f"Error disconnecting EdgeX WebSocket: {e}")
+                err("Error disconnecting EdgeX WebSocket: %s", e)
 
         if self.bybit_ws:
             try:
-                self.logger.info("🔌 Bybit WebSocket will be disconnected")
+                info("🔌 Bybit WebSocket will be disconnected")
             except Exception as e:
-                self.logger.error(f"Error disconnecting Bybit WebSocket: {e}")
+                err("Error disconnecting Bybit WebSocket: %s", e)
 
     async def run(self):
         """Main run method."""
+        self.setup_signal_handlers(asyncio.get_running_loop())
+        csv_flusher = asyncio.create_task(self._csv_flusher())
         try:
             await self.trading_loop()
         except KeyboardInterrupt:
@@ -340,6 +545,19 @@ class HedgeBot:
         finally:
             self.logger.info("🔄 Cleaning up...")
             self.shutdown()
+            if self.edgex_ws:
+                try:
+                    await self.edgex_ws.disconnect()
+                except Exception as e:
+                    self.logger.error("Error disconnecting EdgeX WebSocket: %s", e)
+            csv_flusher.cancel()
+            try:
+                self.flush_csv()
+            except Exception as e:
+                self.logger.error("Failed to write trades to CSV: %s", e)
+            self._csv_fh.close()
+            # Flush queued log records and stop the listener thread
+            self._log_listener.stop()
 
 
 def parse_arguments():
@@ -367,5 +585,16 @@ if __name__ == "__main__":
         fill_timeout=args.fill_timeout,
         iterations=args.iter
     )
-    
+
+    # Prefer libuv-based event loops when available; HedgeBot itself is loop-agnostic
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        try:
+            import winloop
+            winloop.install()
+        except ImportError:
+            pass
+
     asyncio.run(bot.run())
@@ -1,46 +1,143 @@
 import asyncio
+import collections
 import json
 import signal
 import logging
 import os
+import queue
 import sys
 import time
-import requests
 import argparse
 import traceback
 import csv
+import decimal
 from decimal import Decimal
+from logging.handlers import QueueHandler, QueueListener
 from typing import Tuple
 
+import msgspec
+from sortedcontainers import SortedDict
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        # Decode so frames still go out as WebSocket text, like json.dumps
+        return orjson.dumps(obj).decode()
+except ImportError:
+    # orjson not available, use stdlib json
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 from lighter.signer_client import SignerClient
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from exchanges.extended import ExtendedClient
+import aiohttp
 import websockets
-from datetime import datetime
-import pytz
+from datetime import datetime, timezone
+
+UTC = timezone.utc
+
+# Decimal constants used in per-call price math, built once instead of parsed on every call
+_D0 = Decimal(0)
+_D1 = Decimal(1)
+_TICK_NUDGE = Decimal("0.1")  # Lighter order price offset from the opposite best level
+
+# Lighter hedge order slippage vs the best level, in permille (x1.002 / x0.998) for integer tick math
+_SLIP_UP = 1002
+_SLIP_DOWN = 998
+
+# Bound Context.create_decimal for the WebSocket parsers: skips the per-call context lookup of Decimal().
+# Exchange prices/sizes carry at most a dozen significant digits, so the parser gets its own 12-digit
+# context; the thread's default context is left alone since the exchange SDKs share it.
+_WS_DECIMAL_CONTEXT = decimal.Context(prec=12)
+_cd = _WS_DECIMAL_CONTEXT.create_decimal
+
+# Constant Lighter WebSocket frames (sent as text, like the json.dumps output they replace)
+_PONG_FRAME = '{"type":"pong"}'
+
+
+def _subscribe_frame(market_index) -> str:
+    """Lighter order book subscribe frame for a market."""
+    return f'{{"type":"subscribe","channel":"order_book/{market_index}"}}'
+
+
+# Extended depth stream schema: stream messages are converted into these (unknown fields are ignored)
+class _DepthLevel(msgspec.Struct):
+    p: str
+    q: str
+
+
+class _DepthData(msgspec.Struct):
+    b: list[_DepthLevel] = []
+    a: list[_DepthLevel] = []
+
+
+class _DepthMessage(msgspec.Struct):
+    type: str
+    data: _DepthData | None = None
 
 
 class Config:
     """Simple config class to wrap dictionary for Extended client."""
+    __slots__ = ('ticker', 'contract_id', 'quantity', 'tick_size', 'close_order_side')
+
     def __init__(self, config_dict):
-        for key, value in config_dict.items():
-            setattr(self, key, value)
+        self.ticker = config_dict['ticker']
+        self.contract_id = config_dict['contract_id']
+        self.quantity = config_dict['quantity']
+        self.tick_size = config_dict['tick_size']
+        self.close_order_side = config_dict['close_order_side']
 
 
 class HedgeBot:
     """Trading bot that places post-only orders on Extended and hedges with market orders on Lighter."""
 
+    CSV_FLUSH_ROWS = 10
+    CSV_FLUSH_INTERVAL = 1.0
+    # Lighter market config rarely changes; reuse the on-disk copy for this many seconds
+    MARKET_CONFIG_TTL = 3600
+    # Pending Extended book messages kept before the oldest are dropped; the book is then marked not
+    # ready and DELTAs are ignored until the next SNAPSHOT resyncs it
+    OB_QUEUE_MAXLEN = 4096
+
+    # Fixed attribute set: every attribute assigned anywhere on the bot must be listed here
+    __slots__ = (
+        'ticker', 'order_quantity', 'fill_timeout', 'lighter_order_filled', 'lighter_order_filled_event',
+        'iterations', 'extended_position', 'lighter_position', 'current_order', 'log_filename',
+        'csv_filename', 'original_stdout', 'csv_fsync', 'logger', '_log_queue', '_log_listener',
+        '_log_listener_running', 'stop_flag', '_stop_event', 'order_counter', 'extended_client',
+        'extended_contract_id', 'extended_tick_size', 'extended_order_status', 'extended_order_book',
+        '_best_bid_tick', '_best_ask_tick', 'extended_price_scale', 'extended_size_scale',
+        'extended_order_book_ready', 'lighter_client', 'lighter_order_book', 'lighter_best_bid',
+        'lighter_best_ask', 'lighter_price_offset_ticks', 'lighter_order_book_ready',
+        'lighter_order_book_offset', 'lighter_order_book_sequence_gap', 'lighter_snapshot_loaded',
+        '_integrity_counter', '_last_warn_ts', 'lighter_ws_task', '_ob_queue', '_ob_event',
+        'extended_book_task', 'lighter_order_result', 'lighter_order_status', 'lighter_order_price',
+        'lighter_order_side', 'lighter_order_size', 'lighter_order_start_time', 'waiting_for_lighter_fill',
+        'waiting_for_lighter_fill_event', 'wait_start_time', 'order_execution_complete',
+        'current_lighter_side', 'current_lighter_quantity', 'current_lighter_price', 'lighter_base_url',
+        'account_index', 'api_key_index', 'extended_vault', 'extended_stark_key_private',
+        'extended_stark_key_public', 'extended_api_key', '_csv_fh', '_csv_pending_rows', '_csv_last_flush',
+        'lighter_market_index', 'base_amount_multiplier', 'price_multiplier', '_ob_resync',
+        '_csv_flusher_task',
+    )
+
     def __init__(self, ticker: str, order_quantity: Decimal, fill_timeout: int = 5, iterations: int = 20):
         self.ticker = ticker
         self.order_quantity = order_quantity
         self.fill_timeout = fill_timeout
         self.lighter_order_filled = False
+        # Set by handle_lighter_order_result; monitor_lighter_order awaits it instead of polling the flag
+        self.lighter_order_filled_event = asyncio.Event()
         self.iterations = iterations
-        self.extended_position = Decimal('0')
-        self.lighter_position = Decimal('0')
+        self.extended_position = _D0
+        self.lighter_position = _D0
         self.current_order = {}
 
         # Initialize logging to file
@@ -49,8 +146,13 @@ class HedgeBot:
         self.csv_filename = f"logs/extended_{ticker}_hedge_mode_trades.csv"
         self.original_stdout = sys.stdout
 
+        # CSV rows are buffered and flushed every CSV_FLUSH_ROWS rows, and by _csv_flusher at most
+        # CSV_FLUSH_INTERVAL seconds after they were written; HEDGE_CSV_FSYNC=true also fsyncs on each flush
+        self.csv_fsync = os.getenv('HEDGE_CSV_FSYNC', 'false').lower() == 'true'
+
         # Initialize CSV file with headers if it doesn't exist
         self._initialize_csv_file()
+        self._csv_flusher_task = None
 
         # Setup logger
         self.logger = logging.getLogger(f"hedge_bot_{ticker}")
@@ -79,15 +181,22 @@ class HedgeBot:
         file_handler.setFormatter(file_formatter)
         console_handler.setFormatter(console_formatter)
 
-        # Add handlers to logger
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # Only a QueueHandler sits on the logger; the QueueListener thread owns the file/console
+        # handlers so logging from the WebSocket loops never blocks on disk or stdout
+        self._log_queue = queue.Queue(-1)
+        self.logger.addHandler(QueueHandler(self._log_queue))
+        self._log_listener = QueueListener(self._log_queue, file_handler, console_handler,
+                                           respect_handler_level=True)
+        self._log_listener.start()
+        self._log_listener_running = True
 
         # Prevent propagation to root logger to avoid duplicate messages
         self.logger.propagate = False
 
         # State management
         self.stop_flag = False
+        # Set by shutdown() to wake coroutines waiting on it
+        self._stop_event = asyncio.Event()
         self.order_counter = 0
 
         # Extended state
@@ -97,24 +206,43 @@ class HedgeBot:
         self.extended_order_status = None
 
         # Extended order book state for websocket-based BBO
-        self.extended_order_book = {'bids': {}, 'asks': {}}
-        self.extended_best_bid = None
-        self.extended_best_ask = None
+        # Keyed by price * extended_price_scale -> size * extended_size_scale (both ints), kept sorted by SortedDict
+        self.extended_order_book = {'bids': SortedDict(), 'asks': SortedDict()}
+        # Best prices as book keys, maintained incrementally; extended_best_bid/ask convert on demand
+        self._best_bid_tick = None
+        self._best_ask_tick = None
+        # 10**decimals of the tick size / min order size, set once contract info is loaded
+        self.extended_price_scale = 1
+        self.extended_size_scale = 1
         self.extended_order_book_ready = False
 
         # Lighter order book state
         self.lighter_client = None
-        self.lighter_order_book = {"bids": {}, "asks": {}}
+        # Keyed by price ticks (price * price_multiplier) -> size in base units (size * base_amount_multiplier)
+        self.lighter_order_book = {"bids": SortedDict(), "asks": SortedDict()}
+        # Best prices in price ticks; converted to Decimal only at the API boundary
         self.lighter_best_bid = None
         self.lighter_best_ask = None
+        # Lighter order-price offset (_TICK_NUDGE) in price ticks, set once market config is loaded
+        self.lighter_price_offset_ticks = 0
         self.lighter_order_book_ready = False
         self.lighter_order_book_offset = 0
         self.lighter_order_book_sequence_gap = False
         self.lighter_snapshot_loaded = False
-        self.lighter_order_book_lock = asyncio.Lock()
+        # Counts applied updates; validate_order_book_integrity runs every 1000th
+        self._integrity_counter = 0
+        # Last time a rate-limited order book warning was emitted (time.monotonic())
+        self._last_warn_ts = 0.0
 
         # Lighter WebSocket state
         self.lighter_ws_task = None
+        # Extended book messages handed from the stream callback to _consume_extended_book: a bounded
+        # ring (drops the oldest under a burst) plus an event to wake the consumer
+        self._ob_queue = collections.deque(maxlen=self.OB_QUEUE_MAXLEN)
+        self._ob_event = asyncio.Event()
+        # Set when the ring overflowed (a DELTA was lost): the book is stale until the next SNAPSHOT
+        self._ob_resync = False
+        self.extended_book_task = None
         self.lighter_order_result = None
 
         # Lighter order management
@@ -126,6 +254,8 @@ class HedgeBot:
 
         # Strategy state
         self.waiting_for_lighter_fill = False
+        # Set by handle_extended_order_update; trading_loop awaits it instead of polling the flag
+        self.waiting_for_lighter_fill_event = asyncio.Event()
         self.wait_start_time = None
 
         # Order execution tracking
@@ -135,7 +265,6 @@ class HedgeBot:
         self.current_lighter_side = None
         self.current_lighter_quantity = None
         self.current_lighter_price = None
-        self.lighter_order_info = None
 
         # Lighter API configuration
         self.lighter_base_url = "https://mainnet.zklighter.elliot.ai"
@@ -149,29 +278,60 @@ class HedgeBot:
         self.extended_api_key = os.getenv('EXTENDED_API_KEY')
 
     def shutdown(self, signum=None, frame=None):
-        """Graceful shutdown handler."""
+        """Graceful shutdown handler (signal-safe): stop the loops; run() then calls aclose()."""
+        if self.stop_flag:
+            return
         self.stop_flag = True
+        self._stop_event.set()
+        # Wake any pending fill waits; they check stop_flag before acting
+        self.lighter_order_filled_event.set()
+        self.waiting_for_lighter_fill_event.set()
         self.logger.info("\n🛑 Stopping...")
 
+    async def _drain_ws(self):
+        """Cancel the WebSocket tasks and wait for them so their connections close cleanly."""
         # Close WebSocket connections
         if self.extended_client:
+            # Extended's disconnect() also cancels open orders, so its streams are left to stop with the process
+            self.logger.info("🔌 Extended WebSocket will be disconnected")
+
+        for name, task in (("Lighter", self.lighter_ws_task), ("Extended order book consumer", self.extended_book_task)):
+            if task is None or task.done():
+                continue
+            task.cancel()
             try:
-                # Note: disconnect() is async, but shutdown() is sync
-                # We'll let the cleanup happen naturally
-                self.logger.info("🔌 Extended WebSocket will be disconnected")
+                await asyncio.wait_for(task, timeout=2)
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                pass
             except Exception as e:
-                self.logger.error(f"Error disconnecting Extended WebSocket: {e}")
+                self.logger.error(f"Error cancelling {name} WebSocket task: {e}")
+            self.logger.info(f"🔌 {name} WebSocket task cancelled")
 
-        # Cancel Lighter WebSocket task
-        if self.lighter_ws_task and not self.lighter_ws_task.done():
+    async def aclose(self):
+        """Tear down WebSocket tasks, the CSV file and logging; safe to call more than once."""
+        self.shutdown()
+
+        # Shielded so a second cancellation cannot interrupt the connections' close handshake
+        try:
+            await asyncio.shield(self._drain_ws())
+        except asyncio.CancelledError:
+            pass
+
+        # Write out buffered CSV rows
+        if self._csv_flusher_task is not None and not self._csv_flusher_task.done():
+            self._csv_flusher_task.cancel()
+        if not self._csv_fh.closed:
             try:
-                self.lighter_ws_task.cancel()
-                self.logger.info("🔌 Lighter WebSocket task cancelled")
+                self.flush_csv()
+                self._csv_fh.close()
             except Exception as e:
-                self.logger.error(f"Error cancelling Lighter WebSocket task: {e}")
+                self.logger.error(f"Error closing CSV file: {e}")
 
-        # Close logging handlers properly
-        for handler in self.logger.handlers[:]:
+        # Drain queued log records, then close logging handlers properly
+        if self._log_listener_running:
+            self._log_listener.stop()
+            self._log_listener_running = False
+        for handler in self.logger.handlers[:] + list(self._log_listener.handlers):
             try:
                 handler.close()
                 self.logger.removeHandler(handler)
@@ -179,39 +339,60 @@ class HedgeBot:
                 pass
 
     def _initialize_csv_file(self):
-        """Initialize CSV file with headers if it doesn't exist."""
-        if not os.path.exists(self.csv_filename):
-            with open(self.csv_filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['exchange', 'timestamp', 'side', 'price', 'quantity'])
+        """Initialize CSV file with headers if it doesn't exist and keep it open for appending."""
+        write_header = not os.path.exists(self.csv_filename)
+        self._csv_fh = open(self.csv_filename, 'a', newline='', buffering=8192)
+        if write_header:
+            csv.writer(self._csv_fh).writerow(['exchange', 'timestamp', 'side', 'price', 'quantity'])
+            self._csv_fh.flush()
+        self._csv_pending_rows = 0
+        self._csv_last_flush = time.monotonic()
+
+    def flush_csv(self):
+        """Flush buffered CSV rows to disk (and fsync if HEDGE_CSV_FSYNC is set)."""
+        self._csv_fh.flush()
+        if self.csv_fsync:
+            os.fsync(self._csv_fh.fileno())
+        self._csv_pending_rows = 0
+        self._csv_last_flush = time.monotonic()
+
+    async def _csv_flusher(self):
+        """Flush buffered CSV rows every CSV_FLUSH_INTERVAL seconds so a burst's last rows don't wait for a later trade."""
+        while not self.stop_flag:
+            await asyncio.sleep(self.CSV_FLUSH_INTERVAL)
+            if not self._csv_pending_rows:
+                continue
+            try:
+                self.flush_csv()
+            except Exception as e:
+                self.logger.error(f"❌ Failed to flush trades CSV: {e}")
 
     def log_trade_to_csv(self, exchange: str, side: str, price: str, quantity: str):
         """Log trade details to CSV file."""
-        timestamp = datetime.now(pytz.UTC).isoformat()
-
-        with open(self.csv_filename, 'a', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                exchange,
-                timestamp,
-                side,
-                price,
-                quantity
-            ])
+        timestamp = datetime.now(UTC).isoformat()
+
+        # Fields are exchange/side names, an ISO timestamp and numbers (never commas or quotes), so the
+        # row is written directly instead of going through csv.writer quoting
+        self._csv_fh.write(f"{exchange},{timestamp},{side},{price},{quantity}\r\n")
+        self._csv_pending_rows += 1
+        if (self._csv_pending_rows >= self.CSV_FLUSH_ROWS or
+                time.monotonic() - self._csv_last_flush >= self.CSV_FLUSH_INTERVAL):
+            self.flush_csv()
 
         self.logger.info(f"📊 Trade logged to CSV: {exchange} {side} {quantity} @ {price}")
 
     def handle_lighter_order_result(self, order_data):
         """Handle Lighter order result from WebSocket."""
         try:
-            order_data["avg_filled_price"] = (Decimal(order_data["filled_quote_amount"]) /
-                                              Decimal(order_data["filled_base_amount"]))
+            # Decimal keeps the logged/CSV average price exact (one division per fill, off the book path)
+            filled_base_amount = Decimal(order_data["filled_base_amount"])
+            order_data["avg_filled_price"] = Decimal(order_data["filled_quote_amount"]) / filled_base_amount
             if order_data["is_ask"]:
                 order_data["side"] = "SHORT"
-                self.lighter_position -= Decimal(order_data["filled_base_amount"])
+                self.lighter_position -= filled_base_amount
             else:
                 order_data["side"] = "LONG"
-                self.lighter_position += Decimal(order_data["filled_base_amount"])
+                self.lighter_position += filled_base_amount
 
             self.logger.info(f"📊 Lighter order filled: {order_data['side']} "
                              f"{order_data['filled_base_amount']} @ {order_data['avg_filled_price']}")
@@ -227,40 +408,79 @@ class HedgeBot:
             # Mark execution as complete
             self.lighter_order_filled = True  # Mark order as filled
             self.order_execution_complete = True
+            self.lighter_order_filled_event.set()
 
         except Exception as e:
             self.logger.error(f"Error handling Lighter order result: {e}")
 
-    async def reset_lighter_order_book(self):
+    def reset_lighter_order_book(self):
         """Reset Lighter order book state."""
-        async with self.lighter_order_book_lock:
-            self.lighter_order_book["bids"].clear()
-            self.lighter_order_book["asks"].clear()
-            self.lighter_order_book_offset = 0
-            self.lighter_order_book_sequence_gap = False
-            self.lighter_snapshot_loaded = False
-            self.lighter_best_bid = None
-            self.lighter_best_ask = None
+        self.lighter_order_book["bids"].clear()
+        self.lighter_order_book["asks"].clear()
+        self.lighter_order_book_offset = 0
+        self.lighter_order_book_sequence_gap = False
+        self.lighter_snapshot_loaded = False
+        self.lighter_best_bid = None
+        self.lighter_best_ask = None
 
     def update_lighter_order_book(self, side: str, levels: list):
         """Update Lighter order book with new levels."""
+        book = self.lighter_order_book[side]
+        # Bound once: this loop runs for every level of every update frame
+        book_set = book.__setitem__
+        book_pop = book.pop
+        price_multiplier = self.price_multiplier
+        base_amount_multiplier = self.base_amount_multiplier
         for level in levels:
-            # Handle different data structures - could be list [price, size] or dict {"price": ..., "size": ...}
-            if isinstance(level, list) and len(level) >= 2:
-                price = Decimal(level[0])
-                size = Decimal(level[1])
-            elif isinstance(level, dict):
-                price = Decimal(level.get("price", 0))
-                size = Decimal(level.get("size", 0))
+            # Handle different data structures - dict {"price": ..., "size": ...} (what Lighter sends) or list [price, size]
+            # Prices/sizes go straight to integer ticks/units; round() absorbs float representation error
+            level_type = type(level)
+            if level_type is dict:
+                price_tick = round(float(level.get("price", 0)) * price_multiplier)
+                size = round(float(level.get("size", 0)) * base_amount_multiplier)
+            elif level_type is list and len(level) >= 2:
+                price_tick = round(float(level[0]) * price_multiplier)
+                size = round(float(level[1]) * base_amount_multiplier)
             else:
-                self.logger.warning(f"⚠️ Unexpected level format: {level}")
+                # A malformed feed repeats this per level; warn at most once per second
+                now = time.monotonic()
+                if now - self._last_warn_ts >= 1.0:
+                    self._last_warn_ts = now
+                    self.logger.warning("⚠️ Unexpected level format: %s", level)
                 continue
 
+            if price_tick <= 0:
+                continue
             if size > 0:
-                self.lighter_order_book[side][price] = size
+                book_set(price_tick, size)
             else:
                 # Remove zero size orders
-                self.lighter_order_book[side].pop(price, None)
+                book_pop(price_tick, None)
+
+    def _bulk_load(self, side: str, levels: list):
+        """Replace one side of the Lighter order book from a snapshot."""
+        price_multiplier = self.price_multiplier
+        base_amount_multiplier = self.base_amount_multiplier
+        try:
+            if levels and isinstance(levels[0], dict):
+                pairs = ((level["price"], level["size"]) for level in levels)
+            else:
+                pairs = ((level[0], level[1]) for level in levels)
+            ticks = ((round(float(price) * price_multiplier), round(float(size) * base_amount_multiplier))
+                     for price, size in pairs)
+            self.lighter_order_book[side] = SortedDict(
+                {price_tick: size for price_tick, size in ticks if price_tick > 0 and size > 0})
+        except (KeyError, IndexError, TypeError, ValueError):
+            # Mixed or malformed levels: rebuild through the per-level path, which warns and skips them
+            self.lighter_order_book[side].clear()
+            self.update_lighter_order_book(side, levels)
+
+    def update_lighter_best_ticks(self):
+        """Refresh lighter_best_bid/lighter_best_ask (price ticks) from the sorted books."""
+        if self.lighter_order_book["bids"]:
+            self.lighter_best_bid = self.lighter_order_book["bids"].peekitem(-1)[0]
+        if self.lighter_order_book["asks"]:
+            self.lighter_best_ask = self.lighter_order_book["asks"].peekitem(0)[0]
 
     def validate_order_book_offset(self, new_offset: int) -> bool:
         """Validate order book offset sequence."""
@@ -285,41 +505,36 @@ class HedgeBot:
         best_bid = None
         best_ask = None
 
+        # Books are sorted by price tick: best bid is the last key, best ask the first
         if self.lighter_order_book["bids"]:
-            best_bid_price = max(self.lighter_order_book["bids"].keys())
-            best_bid_size = self.lighter_order_book["bids"][best_bid_price]
-            best_bid = (best_bid_price, best_bid_size)
+            price_tick, size = self.lighter_order_book["bids"].peekitem(-1)
+            best_bid = (Decimal(price_tick) / self.price_multiplier, Decimal(size) / self.base_amount_multiplier)
 
         if self.lighter_order_book["asks"]:
-            best_ask_price = min(self.lighter_order_book["asks"].keys())
-            best_ask_size = self.lighter_order_book["asks"][best_ask_price]
-            best_ask = (best_ask_price, best_ask_size)
+            price_tick, size = self.lighter_order_book["asks"].peekitem(0)
+            best_ask = (Decimal(price_tick) / self.price_multiplier, Decimal(size) / self.base_amount_multiplier)
 
         return best_bid, best_ask
 
     def get_lighter_mid_price(self) -> Decimal:
         """Get mid price from Lighter order book."""
-        best_bid, best_ask = self.get_lighter_best_levels()
-
-        if best_bid is None or best_ask is None:
+        if self.lighter_best_bid is None or self.lighter_best_ask is None:
             raise Exception("Cannot calculate mid price - missing order book data")
 
-        mid_price = (best_bid[0] + best_ask[0]) / Decimal('2')
+        mid_price = Decimal(self.lighter_best_bid + self.lighter_best_ask) / (2 * self.price_multiplier)
         return mid_price
 
     def get_lighter_order_price(self, is_ask: bool) -> Decimal:
         """Get order price from Lighter order book."""
-        best_bid, best_ask = self.get_lighter_best_levels()
-
-        if best_bid is None or best_ask is None:
+        if self.lighter_best_bid is None or self.lighter_best_ask is None:
             raise Exception("Cannot calculate order price - missing order book data")
 
         if is_ask:
-            order_price = best_bid[0] + Decimal('0.1')
+            order_price_tick = self.lighter_best_bid + self.lighter_price_offset_ticks
         else:
-            order_price = best_ask[0] - Decimal('0.1')
+            order_price_tick = self.lighter_best_ask - self.lighter_price_offset_ticks
 
-        return order_price
+        return Decimal(order_price_tick) / self.price_multiplier
 
     def calculate_adjusted_price(self, original_price: Decimal, side: str, adjustment_percent: Decimal) -> Decimal:
         """Calculate adjusted price for order modification."""
@@ -334,7 +549,16 @@ class HedgeBot:
 
     async def request_fresh_snapshot(self, ws):
         """Request fresh order book snapshot."""
-        await ws.send(json.dumps({"type": "subscribe", "channel": f"order_book/{self.lighter_market_index}"}))
+        await ws.send(_subscribe_frame(self.lighter_market_index))
+
+    async def _lighter_ws_reader(self, ws, frames: asyncio.Queue):
+        """Read raw Lighter WebSocket frames into `frames`; a connection error is queued as the last item."""
+        try:
+            while True:
+                # Blocks when the parser falls 256 frames behind: book deltas and fills must not be dropped
+                await frames.put(await ws.recv())
+        except Exception as e:
+            await frames.put(e)
 
     async def handle_lighter_ws(self):
         """Handle Lighter WebSocket connection and messages."""
@@ -342,14 +566,15 @@ class HedgeBot:
         cleanup_counter = 0
 
         while not self.stop_flag:
-            timeout_count = 0
             try:
                 # Reset order book state before connecting
-                await self.reset_lighter_order_book()
+                self.reset_lighter_order_book()
 
-                async with websockets.connect(url) as ws:
+                # Library keepalive pings detect a dead peer, so reads block without a polling timeout;
+                # shutdown() cancels this task to interrupt them
+                async with websockets.connect(url, ping_interval=20, ping_timeout=10, max_queue=512) as ws:
                     # Subscribe to order book updates
-                    await ws.send(json.dumps({"type": "subscribe", "channel": f"order_book/{self.lighter_market_index}"}))
+                    await ws.send(_subscribe_frame(self.lighter_market_index))
 
                     # Subscribe to account orders updates
                     account_orders_channel = f"account_orders/{self.lighter_market_index}/{self.account_index}"
@@ -367,52 +592,67 @@ class HedgeBot:
                                 "channel": account_orders_channel,
                                 "auth": auth_token
                             }
-                            await ws.send(json.dumps(auth_message))
+                            await ws.send(_json_dumps(auth_message))
                             self.logger.info("✅ Subscribed to account orders with auth token (expires in 10 minutes)")
                     except Exception as e:
                         self.logger.warning(f"⚠️ Error creating auth token for account orders subscription: {e}")
 
-                    while not self.stop_flag:
-                        try:
-                            msg = await asyncio.wait_for(ws.recv(), timeout=1)
-
+                    # A reader task pulls raw frames off the socket while this loop parses them and
+                    # updates the book, so recv() is never stalled behind book updates
+                    frames = asyncio.Queue(maxsize=256)
+                    reader_task = asyncio.create_task(self._lighter_ws_reader(ws, frames))
+                    try:
+                        while not self.stop_flag:
                             try:
-                                data = json.loads(msg)
-                            except json.JSONDecodeError as e:
-                                self.logger.warning(f"⚠️ JSON parsing error in Lighter websocket: {e}")
-                                continue
+                                msg = await frames.get()
+                                if isinstance(msg, Exception):
+                                    # Reader stopped (connection closed or error); handle it like a failed recv()
+                                    raise msg
+
+                                # Only order book, account order and ping frames are handled below; a substring
+                                # test skips anything else without a full JSON decode (Lighter sends text frames)
+                                if (type(msg) is str and "order_book" not in msg and "account_orders" not in msg
+                                        and "ping" not in msg):
+                                    continue
 
-                            # Reset timeout counter on successful message
-                            timeout_count = 0
+                                try:
+                                    data = _json_loads(msg)
+                                except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
+                                    self.logger.warning(f"⚠️ JSON parsing error in Lighter websocket: {e}")
+                                    continue
 
-                            async with self.lighter_order_book_lock:
+                                # The book has a single writer (this loop) and the updates below do not
+                                # await, so readers never see a half-applied message without a lock
                                 if data.get("type") == "subscribed/order_book":
-                                    # Initial snapshot - clear and populate the order book
-                                    self.lighter_order_book["bids"].clear()
-                                    self.lighter_order_book["asks"].clear()
+                                    # Initial snapshot - replace the order book
+                                    self.lighter_best_bid = None
+                                    self.lighter_best_ask = None
 
                                     # Handle the initial snapshot
                                     order_book = data.get("order_book", {})
                                     if order_book and "offset" in order_book:
                                         self.lighter_order_book_offset = order_book["offset"]
-                                        self.logger.info(f"✅ Initial order book offset set to: {self.lighter_order_book_offset}")
+                                        self.logger.info("✅ Initial order book offset set to: %s",
+                                                         self.lighter_order_book_offset)
 
                                     # Debug: Log the structure of bids and asks
                                     bids = order_book.get("bids", [])
                                     asks = order_book.get("asks", [])
-                                    if bids:
-                                        self.logger.debug(f"📊 Sample bid structure: {bids[0] if bids else 'None'}")
-                                    if asks:
-                                        self.logger.debug(f"📊 Sample ask structure: {asks[0] if asks else 'None'}")
-
-                                    self.update_lighter_order_book("bids", bids)
-                                    self.update_lighter_order_book("asks", asks)
+                                    if self.logger.isEnabledFor(logging.DEBUG):
+                                        if bids:
+                                            self.logger.debug("📊 Sample bid structure: %s", bids[0])
+                                        if asks:
+                                            self.logger.debug("📊 Sample ask structure: %s", asks[0])
+
+                                    self._bulk_load("bids", bids)
+                                    self._bulk_load("asks", asks)
+                                    self.update_lighter_best_ticks()
                                     self.lighter_snapshot_loaded = True
                                     self.lighter_order_book_ready = True
 
-                                    self.logger.info(f"✅ Lighter order book snapshot loaded with "
-                                                     f"{len(self.lighter_order_book['bids'])} bids and "
-                                                     f"{len(self.lighter_order_book['asks'])} asks")
+                                    self.logger.info("✅ Lighter order book snapshot loaded with %d bids and %d asks",
+                                                     len(self.lighter_order_book['bids']),
+                                                     len(self.lighter_order_book['asks']))
 
                                 elif data.get("type") == "update/order_book" and self.lighter_snapshot_loaded:
                                     # Extract offset from the message
@@ -432,23 +672,19 @@ class HedgeBot:
                                     self.update_lighter_order_book("bids", order_book.get("bids", []))
                                     self.update_lighter_order_book("asks", order_book.get("asks", []))
 
-                                    # Validate order book integrity after update
-                                    if not self.validate_order_book_integrity():
+                                    # Full integrity scan is O(N); update_lighter_order_book already rejects
+                                    # non-positive prices and drops empty levels, so only spot-check it
+                                    self._integrity_counter += 1
+                                    if self._integrity_counter % 1000 == 0 and not self.validate_order_book_integrity():
                                         self.logger.warning("🔄 Order book integrity check failed, requesting fresh snapshot...")
                                         break
 
-                                    # Get the best bid and ask levels
-                                    best_bid, best_ask = self.get_lighter_best_levels()
-
-                                    # Update global variables
-                                    if best_bid is not None:
-                                        self.lighter_best_bid = best_bid[0]
-                                    if best_ask is not None:
-                                        self.lighter_best_ask = best_ask[0]
+                                    # Update best bid/ask ticks
+                                    self.update_lighter_best_ticks()
 
                                 elif data.get("type") == "ping":
                                     # Respond to ping with pong
-                                    await ws.send(json.dumps({"type": "pong"}))
+                                    await ws.send(_PONG_FRAME)
                                 elif data.get("type") == "update/account_orders":
                                     # Handle account orders updates
                                     orders = data.get("orders", {}).get(str(self.lighter_market_index), [])
@@ -460,45 +696,50 @@ class HedgeBot:
                                     # Ignore updates until we have the initial snapshot
                                     continue
 
-                            # Periodic cleanup outside the lock
-                            cleanup_counter += 1
-                            if cleanup_counter >= 1000:
-                                cleanup_counter = 0
+                                # Periodic cleanup
+                                cleanup_counter += 1
+                                if cleanup_counter >= 1000:
+                                    cleanup_counter = 0
+
+                                # Handle sequence gap and integrity issues
+                                if self.lighter_order_book_sequence_gap:
+                                    try:
+                                        await self.request_fresh_snapshot(ws)
+                                        self.lighter_order_book_sequence_gap = False
+                                    except Exception as e:
+                                        self.logger.error(f"⚠️ Failed to request fresh snapshot: {e}")
+                                        break
 
-                            # Handle sequence gap and integrity issues outside the lock
-                            if self.lighter_order_book_sequence_gap:
-                                try:
-                                    await self.request_fresh_snapshot(ws)
-                                    self.lighter_order_book_sequence_gap = False
-                                except Exception as e:
-                                    self.logger.error(f"⚠️ Failed to request fresh snapshot: {e}")
-                                    break
-
-                        except asyncio.TimeoutError:
-                            timeout_count += 1
-                            if timeout_count % 3 == 0:
-                                self.logger.warning(f"⏰ No message from Lighter websocket for {timeout_count} seconds")
-                            continue
-                        except websockets.exceptions.ConnectionClosed as e:
-                            self.logger.warning(f"⚠️ Lighter websocket connection closed: {e}")
-                            break
-                        except websockets.exceptions.WebSocketException as e:
-                            self.logger.warning(f"⚠️ Lighter websocket error: {e}")
-                            break
-                        except Exception as e:
-                            self.logger.error(f"⚠️ Error in Lighter websocket: {e}")
-                            self.logger.error(f"⚠️ Full traceback: {traceback.format_exc()}")
-                            break
+                            except websockets.exceptions.ConnectionClosed as e:
+                                self.logger.warning(f"⚠️ Lighter websocket connection closed: {e}")
+                                break
+                            except websockets.exceptions.WebSocketException as e:
+                                self.logger.warning(f"⚠️ Lighter websocket error: {e}")
+                                break
+                            except Exception as e:
+                                self.logger.error(f"⚠️ Error in Lighter websocket: {e}")
+                                self.logger.error(f"⚠️ Full traceback: {traceback.format_exc()}")
+                                break
+                    finally:
+                        reader_task.cancel()
             except Exception as e:
                 self.logger.error(f"⚠️ Failed to connect to Lighter websocket: {e}")
 
-            # Wait a bit before reconnecting
-            await asyncio.sleep(2)
+            # Wait a bit before reconnecting (returns early on shutdown)
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=2)
+            except asyncio.TimeoutError:
+                pass
 
     def setup_signal_handlers(self):
-        """Setup signal handlers for graceful shutdown."""
-        signal.signal(signal.SIGINT, self.shutdown)
-        signal.signal(signal.SIGTERM, self.shutdown)
+        """Setup signal handlers for graceful shutdown, run on the event loop where supported."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.shutdown)
+            except NotImplementedError:
+                # Windows event loops have no add_signal_handler
+                signal.signal(sig, self.shutdown)
 
     def initialize_lighter_client(self):
         """Initialize the Lighter client."""
@@ -524,7 +765,8 @@ class HedgeBot:
 
     def initialize_extended_client(self):
         """Initialize the Extended client."""
-        if not all([self.extended_vault, self.extended_stark_key_private, self.extended_stark_key_public, self.extended_api_key]):
+        if not all([self.extended_vault, self.extended_stark_key_private,
+                    self.extended_stark_key_public, self.extended_api_key]):
             raise ValueError("EXTENDED_VAULT, EXTENDED_STARK_KEY_PRIVATE, EXTENDED_STARK_KEY_PUBLIC, and EXTENDED_API_KEY must be set in environment variables")
 
         # Create config for Extended client
@@ -545,25 +787,44 @@ class HedgeBot:
         self.logger.info("✅ Extended client initialized successfully")
         return self.extended_client
 
-    def get_lighter_market_config(self) -> Tuple[int, int, int]:
-        """Get Lighter market configuration."""
+    async def get_lighter_market_config(self) -> Tuple[int, int, int]:
+        """Get Lighter market configuration (cached in logs/ for MARKET_CONFIG_TTL seconds)."""
+        cache_filename = f"logs/market_config_{self.ticker}.json"
+        try:
+            if time.time() - os.path.getmtime(cache_filename) < self.MARKET_CONFIG_TTL:
+                with open(cache_filename, 'rb') as f:
+                    market = _json_loads(f.read())
+                return (market["market_id"],
+                        pow(10, market["supported_size_decimals"]),
+                        pow(10, market["supported_price_decimals"]))
+        except (OSError, ValueError, KeyError):
+            # Missing, stale or unreadable cache: fetch from the API
+            pass
+
         url = f"{self.lighter_base_url}/api/v1/orderBooks"
         headers = {"accept": "application/json"}
 
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    response.raise_for_status()
+                    text = await response.text()
 
-            if not response.text.strip():
+            if not text.strip():
                 raise Exception("Empty response from Lighter API")
 
-            data = response.json()
+            data = _json_loads(text)
 
             if "order_books" not in data:
                 raise Exception("Unexpected response format")
 
             for market in data["order_books"]:
                 if market["symbol"] == self.ticker:
+                    try:
+                        with open(cache_filename, 'w') as f:
+                            f.write(_json_dumps(market))
+                    except OSError as e:
+                        self.logger.warning(f"⚠️ Could not cache market config: {e}")
                     return (market["market_id"],
                             pow(10, market["supported_size_decimals"]),
                             pow(10, market["supported_price_decimals"]))
@@ -607,7 +868,7 @@ class HedgeBot:
         """Round price to tick size."""
         if self.extended_tick_size is None:
             return price
-        return (price / self.extended_tick_size).quantize(Decimal('1')) * self.extended_tick_size
+        return (price / self.extended_tick_size).quantize(_D1) * self.extended_tick_size
 
     async def place_bbo_order(self, side: str, quantity: Decimal):
         # Get best bid/ask prices
@@ -634,16 +895,18 @@ class HedgeBot:
         self.logger.info(f"[OPEN] [Extended] [{side}] Placing Extended POST-ONLY order")
         order_id, order_price = await self.place_bbo_order(side, quantity)
 
-        start_time = time.time()
-        last_cancel_time = 0
-        
+        # Monotonic deadlines: the order may be replaced after 10s, and cancels are at least 5s apart
+        loop = asyncio.get_running_loop()
+        cancel_deadline = loop.time() + 10
+        next_cancel_time = 0.0
+
         while not self.stop_flag:
             if self.extended_order_status in ['CANCELED', 'CANCELLED']:
                 self.logger.info(f"Order {order_id} was canceled, placing new order")
                 self.extended_order_status = None  # Reset to None to trigger new order
                 order_id, order_price = await self.place_bbo_order(side, quantity)
-                start_time = time.time()
-                last_cancel_time = 0  # Reset cancel timer
+                cancel_deadline = loop.time() + 10
+                next_cancel_time = 0.0  # Reset cancel timer
                 await asyncio.sleep(0.5)
             elif self.extended_order_status in ['NEW', 'OPEN', 'PENDING', 'CANCELING', 'PARTIALLY_FILLED']:
                 await asyncio.sleep(0.5)
@@ -658,16 +921,16 @@ class HedgeBot:
                         should_cancel = True
 
                 # Cancel order if it's been too long or price is off
-                current_time = time.time()
-                if current_time - start_time > 10:
-                    if should_cancel and current_time - last_cancel_time > 5:  # Prevent rapid cancellations
+                now = loop.time()
+                if now > cancel_deadline:
+                    if should_cancel and now > next_cancel_time:  # Prevent rapid cancellations
                         try:
                             self.logger.info(f"Canceling order {order_id} due to timeout/price mismatch")
                             cancel_result = await self.extended_client.cancel_order(order_id)
                             self.logger.info(f"cancel_result: {cancel_result}")
                             if cancel_result.success:
-                                last_cancel_time = current_time
-                                # Don't reset start_time here, let the cancellation trigger new order
+                                next_cancel_time = now + 5
+                                # Don't reset cancel_deadline here, let the cancellation trigger new order
                             else:
                                 self.logger.error(f"❌ Error canceling Extended order: {cancel_result.error_message}")
                         except Exception as e:
@@ -684,82 +947,131 @@ class HedgeBot:
                 else:
                     await asyncio.sleep(0.5)
 
-    def handle_extended_order_book_update(self, message):
+    def handle_extended_order_book_update(self, message: _DepthMessage):
         """Handle Extended order book updates from WebSocket."""
         try:
-            if isinstance(message, str):
-                message = json.loads(message)
-
-            self.logger.debug(f"Received Extended order book message: {message}")
+            # Messages arrive already converted (and debug-logged) by extended_orderbook_handler
 
             # Check if this is an order book update message
-            if message.get("type") in ["SNAPSHOT", "DELTA"]:
-                data = message.get("data", {})
+            if message.type in ("SNAPSHOT", "DELTA"):
+                data = message.data
 
-                if data:
+                if data is not None:
                     # Handle SNAPSHOT - replace entire order book
-                    if message.get("type") == "SNAPSHOT":
+                    if message.type == "SNAPSHOT":
                         self.extended_order_book['bids'].clear()
                         self.extended_order_book['asks'].clear()
+                        self._best_bid_tick = None
+                        self._best_ask_tick = None
 
-                    # Update bids - Extended format is [{"p": "price", "q": "size"}, ...]
-                    bids = data.get('b', [])
-                    for bid in bids:
-                        if isinstance(bid, dict):
-                            price = Decimal(bid.get('p', '0'))
-                            size = Decimal(bid.get('q', '0'))
-                        else:
-                            # Fallback for array format [price, size]
-                            price = Decimal(bid[0])
-                            size = Decimal(bid[1])
-                        
-                        if size > 0:
-                            self.extended_order_book['bids'][price] = size
-                        else:
-                            # Remove zero size orders
-                            self.extended_order_book['bids'].pop(price, None)
-
-                    # Update asks - Extended format is [{"p": "price", "q": "size"}, ...]
-                    asks = data.get('a', [])
-                    for ask in asks:
-                        if isinstance(ask, dict):
-                            price = Decimal(ask.get('p', '0'))
-                            size = Decimal(ask.get('q', '0'))
-                        else:
-                            # Fallback for array format [price, size]
-                            price = Decimal(ask[0])
-                            size = Decimal(ask[1])
-                        
-                        if size > 0:
-                            self.extended_order_book['asks'][price] = size
-                        else:
-                            # Remove zero size orders
-                            self.extended_order_book['asks'].pop(price, None)
-
-                    # Update best bid and ask
-                    if self.extended_order_book['bids']:
-                        self.extended_best_bid = max(self.extended_order_book['bids'].keys())
-                    if self.extended_order_book['asks']:
-                        self.extended_best_ask = min(self.extended_order_book['asks'].keys())
-
-                    if not self.extended_order_book_ready:
-                        self.extended_order_book_ready = True
-                        self.logger.info(f"📊 Extended order book ready - Best bid: {self.extended_best_bid}, "
-                                         f"Best ask: {self.extended_best_ask}")
-                    else:
-                        self.logger.debug(f"📊 Order book updated - Best bid: {self.extended_best_bid}, "
-                                          f"Best ask: {self.extended_best_ask}")
+                    book = self.extended_order_book
+                    self._best_bid_tick = self._apply_side(book['bids'], data.b, self._best_bid_tick, True)
+                    self._best_ask_tick = self._apply_side(book['asks'], data.a, self._best_ask_tick, False)
 
         except Exception as e:
             self.logger.error(f"Error handling Extended order book update: {e}")
             self.logger.error(f"Message content: {message}")
 
-    def handle_extended_order_update(self, order_data):
-        """Handle Extended order updates from WebSocket."""
-        side = order_data.get('side', '').lower()
-        filled_size = Decimal(order_data.get('filled_size', '0'))
-        price = Decimal(order_data.get('price', '0'))
+    @property
+    def extended_best_bid(self):
+        """Best Extended bid as a Decimal price, or None if the bid side is empty."""
+        if self._best_bid_tick is None:
+            return None
+        return Decimal(self._best_bid_tick) / self.extended_price_scale
 
+    @property
+    def extended_best_ask(self):
+        """Best Extended ask as a Decimal price, or None if the ask side is empty."""
+        if self._best_ask_tick is None:
+            return None
+        return Decimal(self._best_ask_tick) / self.extended_price_scale
+
+    def _apply_side(self, book_side, levels, best, is_bid: bool):
+        """Apply Extended _DepthLevel entries to one book side; returns that side's updated best price key."""
+        # Book keys/values are integer-scaled prices/sizes
+        price_scale = self.extended_price_scale
+        size_scale = self.extended_size_scale
+        best_end = -1 if is_bid else 0
+        # Bind hot callables to locals for the per-level loop
+        cd = _cd
+        book_set = book_side.__setitem__
+        book_pop = book_side.pop
+        for level in levels:
+            price_tick = int(cd(level.p) * price_scale)
+            qty = cd(level.q)
+            if qty:
+                # Never let a non-zero quantity round down into a deletion
+                book_set(price_tick, max(1, int(qty * size_scale)))
+                if best is None or (price_tick > best if is_bid else price_tick < best):
+                    best = price_tick
+            else:
+                # Remove zero size orders
+                book_pop(price_tick, None)
+                if price_tick == best:
+                    best = book_side.peekitem(best_end)[0] if book_side else None
+        return best
+
+    def refresh_extended_bbo(self):
+        """Mark the Extended order book ready once either side has a best price."""
+        if self._best_bid_tick is None and self._best_ask_tick is None:
+            return
+        self.extended_order_book_ready = True
+        self.logger.info(f"📊 Extended order book ready - Best bid: {self.extended_best_bid}, "
+                         f"Best ask: {self.extended_best_ask}")
+
+    def extended_orderbook_handler(self, message: dict):
+        """Queue an Extended orderbook stream message for _consume_extended_book."""
+        try:
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Received Extended order book message: %s", message)
+
+            if message.get("type") in ("SNAPSHOT", "DELTA"):
+                ring = self._ob_queue
+                if len(ring) == ring.maxlen and not self._ob_resync:
+                    # The append below drops the oldest message, so the book can no longer be trusted
+                    self.logger.warning(f"⚠️ Extended order book queue full ({ring.maxlen}), "
+                                        f"dropping updates until the next SNAPSHOT")
+                    self._ob_resync = True
+                    self.extended_order_book_ready = False
+                ring.append(msgspec.convert(message, _DepthMessage))
+                self._ob_event.set()
+
+        except msgspec.ValidationError as e:
+            self.logger.warning(f"Failed to parse Extended order book message: {e}")
+        except Exception as e:
+            self.logger.error(f"Error handling Extended order book message: {e}")
+
+    async def _consume_extended_book(self):
+        """Apply queued Extended book messages in batches, refreshing the BBO once per batch."""
+        ring = self._ob_queue
+        while True:
+            await self._ob_event.wait()
+            self._ob_event.clear()
+            # No await between copy and clear, so the producer cannot interleave
+            batch = list(ring)
+            ring.clear()
+            if not batch:
+                continue
+
+            # A SNAPSHOT replaces the whole book, so anything queued before the last one is moot
+            for i in range(len(batch) - 1, 0, -1):
+                if batch[i].type == "SNAPSHOT":
+                    batch = batch[i:]
+                    break
+
+            if self._ob_resync:
+                # A DELTA was lost on overflow: leave the book alone until a SNAPSHOT replaces it
+                if batch[0].type != "SNAPSHOT":
+                    continue
+                self._ob_resync = False
+
+            for message in batch:
+                self.handle_extended_order_book_update(message)
+            if not self.extended_order_book_ready:
+                self.refresh_extended_bbo()
+
+    def handle_extended_order_update(self, side: str, filled_size: Decimal, price: Decimal):
+        """Handle a filled Extended order from WebSocket (side is lower-case 'buy'/'sell')."""
         if side == 'buy':
             self.extended_position += filled_size
             lighter_side = 'sell'
@@ -772,13 +1084,8 @@ class HedgeBot:
         self.current_lighter_quantity = filled_size
         self.current_lighter_price = price
 
-        self.lighter_order_info = {
-            'lighter_side': lighter_side,
-            'quantity': filled_size,
-            'price': price
-        }
-
         self.waiting_for_lighter_fill = True
+        self.waiting_for_lighter_fill_event.set()
 
         self.logger.info(f"📋 Ready to place Lighter order: {lighter_side} {filled_size} @ {price}")
 
@@ -786,20 +1093,20 @@ class HedgeBot:
         if not self.lighter_client:
             await self.initialize_lighter_client()
 
-        best_bid, best_ask = self.get_lighter_best_levels()
-
-        # Determine order parameters
+        # Determine order parameters; the limit price is computed in integer ticks (floored, as int() did)
         if lighter_side.lower() == 'buy':
             is_ask = False
-            price = best_ask[0] * Decimal('1.002')
+            price_tick = self.lighter_best_ask * _SLIP_UP // 1000
         else:
             is_ask = True
-            price = best_bid[0] * Decimal('0.998')
+            price_tick = self.lighter_best_bid * _SLIP_DOWN // 1000
+        price = Decimal(price_tick) / self.price_multiplier
 
         self.logger.info(f"Placing Lighter market order: {lighter_side} {quantity} | is_ask: {is_ask}")
 
         # Reset order state
         self.lighter_order_filled = False
+        self.lighter_order_filled_event.clear()
         self.lighter_order_price = price
         self.lighter_order_side = lighter_side
         self.lighter_order_size = quantity
@@ -811,7 +1118,7 @@ class HedgeBot:
                 market_index=self.lighter_market_index,
                 client_order_index=client_order_index,
                 base_amount=int(quantity * self.base_amount_multiplier),
-                price=int(price * self.price_multiplier),
+                price=price_tick,
                 is_ask=is_ask,
                 order_type=self.lighter_client.ORDER_TYPE_LIMIT,
                 time_in_force=self.lighter_client.ORDER_TIME_IN_FORCE_GOOD_TILL_TIME,
@@ -838,32 +1145,28 @@ class HedgeBot:
         """Monitor Lighter order and adjust price if needed."""
         self.logger.info(f"🔍 Starting to monitor Lighter order - Order ID: {client_order_index}")
 
-        start_time = time.time()
-        while not self.lighter_order_filled and not self.stop_flag:
-            # Check for timeout (30 seconds total)
-            if time.time() - start_time > 30:
-                self.logger.error(f"❌ Timeout waiting for Lighter order fill after {time.time() - start_time:.1f}s")
-                self.logger.error(f"❌ Order state - Filled: {self.lighter_order_filled}")
-
-                # Fallback: Mark as filled to continue trading
-                self.logger.warning("⚠️ Using fallback - marking order as filled to continue trading")
-                self.lighter_order_filled = True
-                self.waiting_for_lighter_fill = False
-                self.order_execution_complete = True
-                break
-
-            await asyncio.sleep(0.1)  # Check every 100ms
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        try:
+            # Wait for the fill (30 seconds total)
+            await asyncio.wait_for(self.lighter_order_filled_event.wait(), timeout=30)
+        except asyncio.TimeoutError:
+            self.logger.error(f"❌ Timeout waiting for Lighter order fill after {loop.time() - start_time:.1f}s")
+            self.logger.error(f"❌ Order state - Filled: {self.lighter_order_filled}")
+
+            # Fallback: Mark as filled to continue trading
+            self.logger.warning("⚠️ Using fallback - marking order as filled to continue trading")
+            self.lighter_order_filled = True
+            self.waiting_for_lighter_fill = False
+            self.order_execution_complete = True
 
-    async def modify_lighter_order(self, client_order_index: int, new_price: Decimal):
-        """Modify current Lighter order with new price using client_order_index."""
+    async def modify_lighter_order(self, client_order_index: int, lighter_price: int):
+        """Modify current Lighter order with a new price (in price ticks) using client_order_index."""
         try:
             if client_order_index is None:
                 self.logger.error("❌ Cannot modify order - no order ID available")
                 return
 
-            # Calculate new Lighter price
-            lighter_price = int(new_price * self.price_multiplier)
-
             self.logger.info(f"🔧 Attempting to modify order - Market: {self.lighter_market_index}, "
                              f"Client Order Index: {client_order_index}, New Price: {lighter_price}")
 
@@ -880,6 +1183,7 @@ class HedgeBot:
                 self.logger.error(f"❌ Lighter order modification error: {error}")
                 return
 
+            new_price = Decimal(lighter_price) / self.price_multiplier
             self.lighter_order_price = new_price
             self.logger.info(f"🔄 Lighter order modified successfully: {self.lighter_order_side} "
                              f"{self.lighter_order_size} @ {new_price}")
@@ -896,16 +1200,15 @@ class HedgeBot:
 
         def order_update_handler(order_data):
             """Handle order updates from Extended WebSocket."""
-            if order_data.get('contract_id') != self.extended_contract_id:
-                self.logger.info(f"Ignoring order update from {order_data.get('contract_id')}")
-                return
+            # ExtendedClient.handle_account only forwards orders whose market matches its config.contract_id,
+            # which is the same id get_extended_contract_info stored in extended_contract_id
 
             try:
                 order_id = order_data.get('order_id')
                 status = order_data.get('status')
                 side = order_data.get('side', '').lower()
-                filled_size = Decimal(order_data.get('filled_size', '0'))
-                size = Decimal(order_data.get('size', '0'))
+                filled_size = _cd(order_data.get('filled_size') or '0')
+                size = _cd(order_data.get('size') or '0')
                 price = order_data.get('price', '0')
 
                 if side == 'buy':
@@ -930,15 +1233,7 @@ class HedgeBot:
                         quantity=str(filled_size)
                     )
 
-                    self.handle_extended_order_update({
-                        'order_id': order_id,
-                        'side': side,
-                        'status': status,
-                        'size': size,
-                        'price': price,
-                        'contract_id': self.extended_contract_id,
-                        'filled_size': filled_size
-                    })
+                    self.handle_extended_order_update(side, filled_size, _cd(price or '0'))
                 else:
                     if status == 'OPEN':
                         self.logger.info(f"[{order_id}] [{order_type}] [Extended] [{status}]: {size} @ {price}")
@@ -963,71 +1258,18 @@ class HedgeBot:
             self.extended_client.setup_order_update_handler(order_update_handler)
             self.logger.info("✅ Extended WebSocket order update handler set up")
 
+            # Order book updates come from the client's own orderbook stream (no second connection);
+            # _consume_extended_book applies them in batches
+            self.extended_book_task = asyncio.create_task(self._consume_extended_book())
+            self.extended_client.setup_orderbook_handler(self.extended_orderbook_handler)
+
             # Connect to Extended WebSocket
             await self.extended_client.connect()
             self.logger.info("✅ Extended WebSocket connection established")
 
-            # Setup separate WebSocket connection for depth updates
-            await self.setup_extended_depth_websocket()
-
         except Exception as e:
             self.logger.error(f"Could not setup Extended WebSocket handlers: {e}")
 
-    async def setup_extended_depth_websocket(self):
-        """Setup separate WebSocket connection for Extended depth updates."""
-        try:
-            import websockets
-
-            async def handle_depth_websocket():
-                """Handle depth WebSocket connection."""
-                # Use the correct Extended WebSocket URL for order book stream
-                market_name = f"{self.ticker}-USD"  # Extended uses format like BTC-USD
-                url = f"wss://api.starknet.extended.exchange/stream.extended.exchange/v1/orderbooks/{market_name}?depth=1"
-
-                while not self.stop_flag:
-                    try:
-                        async with websockets.connect(url) as ws:
-                            self.logger.info(f"✅ Connected to Extended order book stream for {market_name}")
-
-                            # Listen for messages
-                            async for message in ws:
-                                if self.stop_flag:
-                                    break
-
-                                try:
-                                    # Handle ping frames
-                                    if isinstance(message, bytes) and message == b'\x09':
-                                        await ws.pong()
-                                        continue
-
-                                    data = json.loads(message)
-                                    self.logger.debug(f"Received Extended order book message: {data}")
-
-                                    # Handle order book updates
-                                    if data.get("type") in ["SNAPSHOT", "DELTA"]:
-                                        self.handle_extended_order_book_update(data)
-
-                                except json.JSONDecodeError as e:
-                                    self.logger.warning(f"Failed to parse Extended order book message: {e}")
-                                except Exception as e:
-                                    self.logger.error(f"Error handling Extended order book message: {e}")
-
-                    except websockets.exceptions.ConnectionClosed:
-                        self.logger.warning("Extended order book WebSocket connection closed, reconnecting...")
-                    except Exception as e:
-                        self.logger.error(f"Extended order book WebSocket error: {e}")
-
-                    # Wait before reconnecting
-                    if not self.stop_flag:
-                        await asyncio.sleep(2)
-
-            # Start depth WebSocket in background
-            asyncio.create_task(handle_depth_websocket())
-            self.logger.info("✅ Extended order book WebSocket task started")
-
-        except Exception as e:
-            self.logger.error(f"Could not setup Extended order book WebSocket: {e}")
-
     async def trading_loop(self):
         """Main trading loop implementing the new strategy."""
         self.logger.info(f"🚀 Starting hedge bot for {self.ticker}")
@@ -1039,7 +1281,12 @@ class HedgeBot:
 
             # Get contract info
             self.extended_contract_id, self.extended_tick_size = await self.get_extended_contract_info()
-            self.lighter_market_index, self.base_amount_multiplier, self.price_multiplier = self.get_lighter_market_config()
+            self.extended_price_scale = 10 ** max(0, -self.extended_tick_size.as_tuple().exponent)
+            # Size step (not min order size) so every valid quantity maps to a non-zero integer
+            self.extended_size_scale = 10 ** max(0, -self.extended_client.min_order_size_change.as_tuple().exponent)
+            (self.lighter_market_index, self.base_amount_multiplier,
+             self.price_multiplier) = await self.get_lighter_market_config()
+            self.lighter_price_offset_ticks = int(_TICK_NUDGE * self.price_multiplier)
 
             self.logger.info(f"Contract info loaded - Extended: {self.extended_contract_id}, "
                              f"Lighter: {self.lighter_market_index}")
@@ -1048,6 +1295,8 @@ class HedgeBot:
             self.logger.error(f"❌ Failed to initialize: {e}")
             return
 
+        loop = asyncio.get_running_loop()
+
         # Setup Extended websocket
         try:
             await self.setup_extended_websocket()
@@ -1056,9 +1305,9 @@ class HedgeBot:
             # Wait for initial order book data with timeout
             self.logger.info("⏳ Waiting for initial order book data...")
             timeout = 10  # seconds
-            start_time = time.time()
+            deadline = loop.time() + timeout
             while not self.extended_order_book_ready and not self.stop_flag:
-                if time.time() - start_time > timeout:
+                if loop.time() > deadline:
                     self.logger.warning(f"⚠️ Timeout waiting for WebSocket order book data after {timeout}s")
                     break
                 await asyncio.sleep(0.5)
@@ -1080,9 +1329,9 @@ class HedgeBot:
             # Wait for initial Lighter order book data with timeout
             self.logger.info("⏳ Waiting for initial Lighter order book data...")
             timeout = 10  # seconds
-            start_time = time.time()
+            deadline = loop.time() + timeout
             while not self.lighter_order_book_ready and not self.stop_flag:
-                if time.time() - start_time > timeout:
+                if loop.time() > deadline:
                     self.logger.warning(f"⚠️ Timeout waiting for Lighter WebSocket order book data after {timeout}s")
                     break
                 await asyncio.sleep(0.5)
@@ -1111,102 +1360,58 @@ class HedgeBot:
                 self.logger.error(f"❌ Position diff is too large: {self.extended_position + self.lighter_position}")
                 break
 
-            self.order_execution_complete = False
-            self.waiting_for_lighter_fill = False
-            try:
-                # Determine side based on some logic (for now, alternate)
-                side = 'buy'
-                await self.place_extended_post_only_order(side, self.order_quantity)
-            except Exception as e:
-                self.logger.error(f"⚠️ Error in trading loop: {e}")
-                self.logger.error(f"⚠️ Full traceback: {traceback.format_exc()}")
+            # Determine side based on some logic (for now, alternate)
+            if not await self._execute_leg('buy', self.order_quantity):
                 break
 
-            start_time = time.time()
-            while not self.order_execution_complete and not self.stop_flag:
-                # Check if Extended order filled and we need to place Lighter order
-                if self.waiting_for_lighter_fill:
-                    await self.place_lighter_market_order(
-                        self.current_lighter_side,
-                        self.current_lighter_quantity,
-                        self.current_lighter_price
-                    )
-                    break
-
-                await asyncio.sleep(0.01)
-                if time.time() - start_time > 180:
-                    self.logger.error("❌ Timeout waiting for trade completion")
-                    break
-
             if self.stop_flag:
                 break
 
             # Close position
             self.logger.info(f"[STEP 2] Extended position: {self.extended_position} | Lighter position: {self.lighter_position}")
-            self.order_execution_complete = False
-            self.waiting_for_lighter_fill = False
-            try:
-                # Determine side based on some logic (for now, alternate)
-                side = 'sell'
-                await self.place_extended_post_only_order(side, self.order_quantity)
-            except Exception as e:
-                self.logger.error(f"⚠️ Error in trading loop: {e}")
-                self.logger.error(f"⚠️ Full traceback: {traceback.format_exc()}")
+            if not await self._execute_leg('sell', self.order_quantity):
                 break
 
-            while not self.order_execution_complete and not self.stop_flag:
-                # Check if Extended order filled and we need to place Lighter order
-                if self.waiting_for_lighter_fill:
-                    await self.place_lighter_market_order(
-                        self.current_lighter_side,
-                        self.current_lighter_quantity,
-                        self.current_lighter_price
-                    )
-                    break
-
-                await asyncio.sleep(0.01)
-                if time.time() - start_time > 180:
-                    self.logger.error("❌ Timeout waiting for trade completion")
-                    break
-
             # Close remaining position
             self.logger.info(f"[STEP 3] Extended position: {self.extended_position} | Lighter position: {self.lighter_position}")
-            self.order_execution_complete = False
-            self.waiting_for_lighter_fill = False
             if self.extended_position == 0:
                 continue
-            elif self.extended_position > 0:
-                side = 'sell'
-            else:
-                side = 'buy'
-
-            try:
-                # Determine side based on some logic (for now, alternate)
-                await self.place_extended_post_only_order(side, abs(self.extended_position))
-            except Exception as e:
-                self.logger.error(f"⚠️ Error in trading loop: {e}")
-                self.logger.error(f"⚠️ Full traceback: {traceback.format_exc()}")
+            side = 'sell' if self.extended_position > 0 else 'buy'
+            if not await self._execute_leg(side, abs(self.extended_position)):
                 break
 
-            # Wait for order to be filled via WebSocket
-            while not self.order_execution_complete and not self.stop_flag:
-                # Check if Extended order filled and we need to place Lighter order
-                if self.waiting_for_lighter_fill:
-                    await self.place_lighter_market_order(
-                        self.current_lighter_side,
-                        self.current_lighter_quantity,
-                        self.current_lighter_price
-                    )
-                    break
+    async def _execute_leg(self, side: str, quantity: Decimal) -> bool:
+        """Place an Extended post-only order, wait for its fill and hedge it on Lighter.
 
-                await asyncio.sleep(0.01)
-                if time.time() - start_time > 180:
-                    self.logger.error("❌ Timeout waiting for trade completion")
-                    break
+        Returns False if the Extended order could not be placed.
+        """
+        self.order_execution_complete = False
+        self.waiting_for_lighter_fill = False
+        self.waiting_for_lighter_fill_event.clear()
+        try:
+            await self.place_extended_post_only_order(side, quantity)
+        except Exception:
+            self.logger.exception("⚠️ Error in trading loop")
+            return False
+
+        try:
+            # Wait for the Extended fill via WebSocket, then place the hedging Lighter order
+            await asyncio.wait_for(self.waiting_for_lighter_fill_event.wait(), timeout=180)
+        except asyncio.TimeoutError:
+            self.logger.error("❌ Timeout waiting for trade completion")
+        else:
+            if not self.stop_flag:
+                await self.place_lighter_market_order(
+                    self.current_lighter_side,
+                    self.current_lighter_quantity,
+                    self.current_lighter_price
+                )
+        return True
 
     async def run(self):
         """Run the hedge bot."""
         self.setup_signal_handlers()
+        self._csv_flusher_task = asyncio.create_task(self._csv_flusher())
 
         try:
             await self.trading_loop()
@@ -1214,7 +1419,7 @@ class HedgeBot:
             self.logger.info("\n🛑 Received interrupt signal...")
         finally:
             self.logger.info("🔄 Cleaning up...")
-            self.shutdown()
+            await self.aclose()
 
 
 def parse_arguments():
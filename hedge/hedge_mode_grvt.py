@@ -2,17 +2,26 @@ import asyncio
 import json
 import signal
 import logging
+import queue
 import os
 import sys
 import time
+import random
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import argparse
-import traceback
 import csv
 import datetime
+from collections import deque
 from decimal import Decimal
+from logging.handlers import QueueHandler, QueueListener
 from typing import Tuple
 
+import msgspec
+import numpy as np
+from sortedcontainers import SortedDict
+
 from lighter.signer_client import SignerClient
 import sys
 import os
@@ -20,9 +29,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from exchanges.grvt import GrvtClient
 from exchanges.lighter import LighterClient
+from helpers.log_formatter import CachedTimeFormatter
 import websockets
-from datetime import datetime
-import pytz
+from datetime import datetime, timezone
 
 
 class Config:
@@ -32,9 +41,64 @@ class Config:
             setattr(self, key, value)
 
 
+# Lighter WebSocket schema: frames decode straight into these (unknown fields are ignored)
+class _LighterLevel(msgspec.Struct):
+    price: str
+    size: str
+
+
+class _LighterOrderBook(msgspec.Struct):
+    offset: int | None = None
+    bids: list[_LighterLevel] = []
+    asks: list[_LighterLevel] = []
+
+
+class _LighterMessage(msgspec.Struct):
+    type: str = ""
+    order_book: _LighterOrderBook | None = None
+    orders: dict[str, list[dict]] = {}
+
+
+_decode_lighter = msgspec.json.Decoder(_LighterMessage).decode
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: bursts up to capacity, then refills at rate tokens per second."""
+    __slots__ = ('capacity', 'rate', 'tokens', 'last')
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.last = time.monotonic()
+
+    def take(self, n: float = 1) -> float:
+        """Take n tokens if available and return 0, otherwise return the seconds until they will be."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens >= n:
+            self.tokens -= n
+            return 0
+        return (n - self.tokens) / self.rate
+
+    async def acquire(self, n: float = 1):
+        """Wait until n tokens are taken; the sleep is jittered so reconnecting callers do not retry in lockstep."""
+        while (delay := self.take(n)) > 0:
+            await asyncio.sleep(delay * random.uniform(1.0, 1.2))
+
+
 class HedgeBot:
     """Trading bot that places post-only orders on GRVT and hedges with market orders on Lighter."""
 
+    # Decimal constants used on the pricing paths, parsed once instead of per call
+    _ZERO = Decimal('0')
+    _ONE = Decimal('1')
+    _TICK_OFFSET = Decimal('0.1')  # Lighter order price offset from the opposite best price
+    _DEFAULT_TICK = Decimal('0.01')
+    _SLIP_UP = Decimal('1.01')
+    _SLIP_DOWN = Decimal('0.99')
+
     def __init__(self, ticker: str, order_quantity: Decimal, fill_timeout: int = 30, iterations: int = 20, max_position: Decimal = None):
         self.ticker = ticker
         self.order_quantity = order_quantity
@@ -58,8 +122,19 @@ class HedgeBot:
         
         # 訂單狀態緩存（減少 API 呼叫）
         self.grvt_order_cache = {}  # order_id -> order_info
-        self.last_api_query_time = 0
-        self.api_query_interval = 5  # 最少 5 秒才能查詢一次 API
+
+        # REST rate limiters: GRVT allows ~75 reads per 10s, Lighter standard accounts 60 per minute
+        self.grvt_rate_limiter = TokenBucket(10, 7.5)
+        self.lighter_rate_limiter = TokenBucket(60, 1.0)
+
+        # Read-through cache for REST position queries: (exchange, contract) -> (position, expiry on loop.time())
+        self._position_cache = {}
+        self._position_cache_ttl = 1.0
+
+        # Pooled HTTP session for Lighter REST calls: reuses TCP/TLS connections across calls and reconnects
+        self._http = requests.Session()
+        self._http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                                 max_retries=Retry(total=3, backoff_factor=0.2)))
         
         # Initialize logging to file
         os.makedirs("logs", exist_ok=True)
@@ -104,8 +179,8 @@ class HedgeBot:
         # Disable root logger propagation to prevent external logs
         logging.getLogger().setLevel(logging.CRITICAL)
 
-        # Create file handler
-        file_handler = logging.FileHandler(self.log_filename)
+        # Create file handler (opened on the first record, by the listener thread)
+        file_handler = logging.FileHandler(self.log_filename, delay=True)
         file_handler.setLevel(logging.INFO)
 
         # Create console handler with UTF-8 encoding
@@ -116,16 +191,16 @@ class HedgeBot:
         if hasattr(sys.stdout, 'reconfigure'):
             sys.stdout.reconfigure(encoding='utf-8')
 
-        # Create different formatters for file and console
-        file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        console_formatter = logging.Formatter('%(asctime)s - %(levelname)s:%(name)s:%(message)s')
-
-        file_handler.setFormatter(file_formatter)
-        console_handler.setFormatter(console_formatter)
+        # Different formatters for file and console, owned by this bot's listener thread
+        file_handler.setFormatter(CachedTimeFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        console_handler.setFormatter(CachedTimeFormatter('%(asctime)s - %(levelname)s:%(name)s:%(message)s'))
 
-        # Add handlers to logger
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # Only a QueueHandler sits on the logger; a background QueueListener thread owns the
+        # file/console handlers so the event loop never blocks on disk or stdout writes
+        self._log_queue = queue.SimpleQueue()
+        self.logger.addHandler(QueueHandler(self._log_queue))
+        self._log_listener = QueueListener(self._log_queue, file_handler, console_handler, respect_handler_level=True)
+        self._log_listener.start()
 
         # Prevent propagation to root logger to avoid duplicate messages and external logs
         self.logger.propagate = False
@@ -142,23 +217,41 @@ class HedgeBot:
         self.grvt_contract_id = None
         self.grvt_tick_size = None
         self.grvt_order_status = None
+        # Set by the WS handlers so the order waits wake on updates instead of polling
+        self.grvt_order_event = asyncio.Event()
+        self.lighter_order_event = asyncio.Event()
 
         # GRVT order book state (not used since we use REST API for BBO)
         # Keeping variables for potential future use but not initializing them
 
         # Lighter order book state
         self.lighter_client = None
-        self.lighter_order_book = {"bids": {}, "asks": {}}
+        # Keyed by price ticks (price * price_multiplier) -> size in base units (size * base_amount_multiplier)
+        self.lighter_order_book = {"bids": SortedDict(), "asks": SortedDict()}
+        # Levels kept per side; anything deeper is irrelevant for hedging and is pruned
+        self._depth_k = 32
+        # Pruned levels are never resent by deltas: a side that was cut to _depth_k and has since thinned
+        # below _depth_refill levels no longer shows the true best price and is reloaded from a snapshot
+        self._depth_refill = self._depth_k // 2
+        self._lighter_book_truncated = {"bids": False, "asks": False}
+        # Best prices in price ticks; converted to Decimal only where an order price is built
         self.lighter_best_bid = None
         self.lighter_best_ask = None
         self.lighter_order_book_ready = False
         self.lighter_order_book_offset = 0
         self.lighter_order_book_sequence_gap = False
         self.lighter_snapshot_loaded = False
-        self.lighter_order_book_lock = asyncio.Lock()
+        self.lighter_order_book_lock = asyncio.Lock()  # only guards reset_lighter_order_book; WS updates are single-writer
 
         # Lighter WebSocket state
         self.lighter_ws_task = None
+        self.lighter_ws_last_msg_ts = 0.0  # time.monotonic() of the last frame, read by the watchdog
+        self._lighter_ws_handlers = {
+            "subscribed/order_book": self._on_lighter_snapshot,
+            "update/order_book": self._on_lighter_book_update,
+            "ping": self._on_lighter_ping,
+            "update/account_orders": self._on_lighter_account_orders,
+        }
         self.lighter_order_result = None
 
         # Lighter order management
@@ -176,7 +269,11 @@ class HedgeBot:
         self.order_execution_complete = False
         
         # 艙位快照相關
-        self.position_snapshot_interval = 1  # 1秒快照一次
+        # 自適應快照間隔：持倉一致時逐步放寬（每次 x1.5，最長 10 秒），不一致或成交後回到最短間隔。
+        # 最短間隔等於持倉快取 TTL，更短只會讀到快取值
+        self.position_snapshot_interval_min = self._position_cache_ttl
+        self.position_snapshot_interval_max = 10.0
+        self.position_snapshot_interval = self.position_snapshot_interval_min
         self.last_snapshot_time = 0
         self.position_snapshots = []  # 存儲歷史快照
 
@@ -202,6 +299,10 @@ class HedgeBot:
         self.stop_flag = True
         self.logger.info("\n🛑 Stopping...")
 
+        # Wake any order waits so they observe stop_flag
+        self.grvt_order_event.set()
+        self.lighter_order_event.set()
+
         # Cancel Lighter WebSocket task immediately
         if self.lighter_ws_task and not self.lighter_ws_task.done():
             try:
@@ -264,38 +365,78 @@ class HedgeBot:
         except Exception as e:
             self.logger.error(f"❌ Error during async shutdown: {e}")
         finally:
+            # Write any trades still queued and close the CSV
+            if self._csv_flusher_task and not self._csv_flusher_task.done():
+                self._csv_flusher_task.cancel()
+            try:
+                self.flush_csv()
+            except Exception as e:
+                self.logger.error(f"❌ Failed to write trades to CSV: {e}")
+            self._csv_fh.close()
+            self._http.close()
+
             self.logger.info("✅ Async cleanup completed")
+            # Flush queued log records, stop the listener thread and close the file/console handlers
+            self._log_listener.stop()
+            for handler in self._log_listener.handlers:
+                handler.close()
 
     def _initialize_csv_file(self):
-        """Initialize CSV file with headers if it doesn't exist."""
-        if not os.path.exists(self.csv_filename):
-            with open(self.csv_filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['exchange', 'timestamp', 'side', 'price', 'quantity'])
+        """Open the trade CSV for the bot's lifetime, writing headers if it doesn't exist.
+
+        Trade rows are queued in memory and written in batches by _csv_flusher.
+        """
+        is_new = not os.path.exists(self.csv_filename)
+        self._csv_fh = open(self.csv_filename, 'a', newline='', buffering=1 << 16)
+        self._csv_writer = csv.writer(self._csv_fh)
+        if is_new:
+            self._csv_writer.writerow(['exchange', 'timestamp', 'side', 'price', 'quantity'])
+            self._csv_fh.flush()
+        self._csv_queue = deque()
+        self._csv_flusher_task = None
 
     def log_trade_to_csv(self, exchange: str, side: str, price: str, quantity: str):
-        """Log trade details to CSV file."""
-        timestamp = datetime.now(pytz.UTC).isoformat()
-
-        with open(self.csv_filename, 'a', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                exchange,
-                timestamp,
-                side,
-                price,
-                quantity
-            ])
+        """Queue trade details for the CSV flusher (no file I/O or timestamp formatting on the order handler path)."""
+        self._csv_queue.append([
+            exchange,
+            time.time_ns(),  # formatted to ISO 8601 by flush_csv
+            side,
+            price,
+            quantity
+        ])
 
         self.logger.info(f"📊 Trade logged to CSV: {exchange} {side} {quantity} @ {price}")
 
+    def flush_csv(self):
+        """Write all queued trade rows in one batch."""
+        if not self._csv_queue:
+            return
+        rows = []
+        while self._csv_queue:
+            row = self._csv_queue.popleft()
+            row[1] = datetime.fromtimestamp(row[1] / 1e9, timezone.utc).isoformat()
+            rows.append(row)
+        self._csv_writer.writerows(rows)
+        self._csv_fh.flush()
+
+    async def _csv_flusher(self, interval: float = 0.5):
+        """Background task draining the trade queue every `interval` seconds."""
+        while not self.stop_flag:
+            await asyncio.sleep(interval)
+            try:
+                self.flush_csv()
+            except Exception as e:
+                self.logger.error(f"❌ Failed to write trades to CSV: {e}")
+
     def handle_lighter_order_result(self, order_data):
         """Handle Lighter order result from WebSocket."""
         try:
-            order_data["avg_filled_price"] = (Decimal(order_data["filled_quote_amount"]) /
-                                              Decimal(order_data["filled_base_amount"]))
-            
-            filled_amount = Decimal(order_data["filled_base_amount"])
+            # Amounts arrive as strings: parse the base amount once (it feeds the position), and log/CSV the raw strings
+            filled_base_amount = order_data["filled_base_amount"]
+            filled_amount = Decimal(filled_base_amount)
+            self._position_cache.clear()  # cached REST positions predate this fill
+            order_data["avg_filled_price"] = Decimal(order_data["filled_quote_amount"]) / filled_amount
+
             old_position = self.lighter_position
             
             if order_data["is_ask"]:
@@ -312,24 +453,23 @@ class HedgeBot:
             client_order_index = order_data["client_order_id"]
 
             self.logger.info(f"[{client_order_index}] [{order_type}] [Lighter] [FILLED]: "
-                             f"{order_data['filled_base_amount']} @ {order_data['avg_filled_price']}")
+                             f"{filled_base_amount} @ {order_data['avg_filled_price']}")
 
             # Log Lighter trade to CSV
             self.log_trade_to_csv(
                 exchange='Lighter',
                 side=order_data['side'],
                 price=str(order_data['avg_filled_price']),
-                quantity=str(order_data['filled_base_amount'])
+                quantity=filled_base_amount
             )
 
             # Mark execution as complete
             self.lighter_order_filled = True  # Mark order as filled
             self.order_execution_complete = True
+            self.lighter_order_event.set()
 
         except Exception as e:
-            self.logger.error(f"❌ Error handling Lighter order result: {e}")
-            import traceback
-            self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+            self.logger.exception(f"❌ Error handling Lighter order result: {e}")
 
     async def sync_positions(self):
         """強制同步持倉 - 從 API 查詢實際持倉並更新內部記錄"""
@@ -338,7 +478,7 @@ class HedgeBot:
             
             # 查詢 GRVT 實際持倉
             try:
-                grvt_pos = await self.get_grvt_actual_position()
+                grvt_pos = await self.get_grvt_actual_position(use_cache=False)
                 old_grvt_pos = self.grvt_position
                 self.grvt_position = grvt_pos
                 self.logger.info(f"📊 GRVT position synced: {old_grvt_pos} → {grvt_pos}")
@@ -347,7 +487,7 @@ class HedgeBot:
             
             # 查詢 Lighter 實際持倉
             try:
-                lighter_pos = await self.get_lighter_actual_position()
+                lighter_pos = await self.get_lighter_actual_position(use_cache=False)
                 old_lighter_pos = self.lighter_position
                 self.lighter_position = lighter_pos
                 self.logger.info(f"📊 Lighter position synced: {old_lighter_pos} → {lighter_pos}")
@@ -363,9 +503,7 @@ class HedgeBot:
                 self.logger.info(f"✅ Positions synced successfully: diff={position_diff:.6f}")
                 
         except Exception as e:
-            self.logger.error(f"❌ Error syncing positions: {e}")
-            import traceback
-            self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+            self.logger.exception(f"❌ Error syncing positions: {e}")
 
     async def get_lighter_actual_position(self) -> Decimal:
         """Get actual Lighter position."""
@@ -386,28 +524,50 @@ class HedgeBot:
             self.logger.error(f"❌ Error getting Lighter position: {e}")
             return Decimal(0)
 
-    async def get_grvt_actual_position(self) -> Decimal:
-        """查詢 GRVT 實際持倉"""
+    def _get_cached_position(self, key: tuple):
+        """Return a cached position for key if it has not expired, else None."""
+        entry = self._position_cache.get(key)
+        if entry is not None and entry[1] > asyncio.get_running_loop().time():
+            return entry[0]
+        return None
+
+    def _cache_position(self, key: tuple, position: Decimal) -> Decimal:
+        """Store a freshly queried position for _position_cache_ttl seconds and return it."""
+        self._position_cache[key] = (position, asyncio.get_running_loop().time() + self._position_cache_ttl)
+        return position
+
+    async def get_grvt_actual_position(self, use_cache: bool = True) -> Decimal:
+        """查詢 GRVT 實際持倉（use_cache=False 強制查詢 API，用於同步持倉與成交確認）"""
+        key = ('grvt', self.grvt_contract_id)
+        cached = self._get_cached_position(key) if use_cache else None
+        if cached is not None:
+            return cached
         try:
-            # 使用 GRVT API 查詢持倉
-            positions = await self.grvt_client.get_positions()
+            # 使用 GRVT API 查詢持倉; the SDK's fetch_positions is blocking, so run it off the event loop
+            await self.grvt_rate_limiter.acquire()
+            positions = await asyncio.to_thread(self.grvt_client.rest_client.fetch_positions)
             if positions:
                 for position in positions:
                     if position.get('instrument') == self.grvt_contract_id:
-                        return Decimal(str(position.get('size', 0)))
-            return Decimal('0')
+                        return self._cache_position(key, Decimal(str(position.get('size', 0))))
+            return self._cache_position(key, Decimal('0'))
         except Exception as e:
             self.logger.error(f"❌ Error getting GRVT position: {e}")
             return self.grvt_position  # 返回當前記錄的持倉
 
-    async def get_lighter_actual_position(self) -> Decimal:
-        """查詢 Lighter 實際持倉"""
+    async def get_lighter_actual_position(self, use_cache: bool = True) -> Decimal:
+        """查詢 Lighter 實際持倉（use_cache=False 強制查詢 API，用於同步持倉與成交確認）"""
+        key = ('lighter', self.lighter_market_index)
+        cached = self._get_cached_position(key) if use_cache else None
+        if cached is not None:
+            return cached
         try:
             # 使用 Lighter API 查詢持倉
             from lighter.api.account_api import AccountApi
             account_api = AccountApi(self.lighter_client.api_client)
             
             # 查詢賬戶資訊
+            await self.lighter_rate_limiter.acquire()
             account_response = await account_api.account()
             if account_response and hasattr(account_response, 'account'):
                 account = account_response.account
@@ -416,8 +576,8 @@ class HedgeBot:
                         if hasattr(position, 'market_index') and position.market_index == self.lighter_market_index:
                             # Lighter 持倉以 base amount 為單位
                             base_amount = Decimal(str(position.base_amount)) / self.base_amount_multiplier
-                            return base_amount
-            return Decimal('0')
+                            return self._cache_position(key, base_amount)
+            return self._cache_position(key, Decimal('0'))
         except Exception as e:
             self.logger.error(f"❌ Error getting Lighter position: {e}")
             return self.lighter_position  # 返回當前記錄的持倉
@@ -432,26 +592,69 @@ class HedgeBot:
             self.lighter_snapshot_loaded = False
             self.lighter_best_bid = None
             self.lighter_best_ask = None
+            self._lighter_book_truncated["bids"] = self._lighter_book_truncated["asks"] = False
 
     def update_lighter_order_book(self, side: str, levels: list):
-        """Update Lighter order book with new levels."""
+        """Update Lighter order book with new _LighterLevel entries and refresh that side's cached best price."""
+        book = self.lighter_order_book[side]
+        price_multiplier = self.price_multiplier
+        base_amount_multiplier = self.base_amount_multiplier
         for level in levels:
-            # Handle different data structures - could be list [price, size] or dict {"price": ..., "size": ...}
-            if isinstance(level, list) and len(level) >= 2:
-                price = Decimal(level[0])
-                size = Decimal(level[1])
-            elif isinstance(level, dict):
-                price = Decimal(level.get("price", 0))
-                size = Decimal(level.get("size", 0))
-            else:
-                self.logger.warning(f"⚠️ Unexpected level format: {level}")
-                continue
+            # Prices/sizes go straight to integer ticks/units; round() absorbs float representation error
+            price_tick = round(float(level.price) * price_multiplier)
+            size = round(float(level.size) * base_amount_multiplier)
 
             if size > 0:
-                self.lighter_order_book[side][price] = size
+                book[price_tick] = size
             else:
                 # Remove zero size orders
-                self.lighter_order_book[side].pop(price, None)
+                book.pop(price_tick, None)
+
+        # Books are sorted by price tick: best bid is the last key, best ask the first.
+        # Prune from the far end down to _depth_k levels (a level inserted beyond it is dropped here too)
+        excess = len(book) - self._depth_k
+        if excess > 0:
+            self._lighter_book_truncated[side] = True
+        if side == "bids":
+            for _ in range(excess):
+                book.popitem(0)
+            self.lighter_best_bid = book.peekitem(-1)[0] if book else None
+        else:
+            for _ in range(excess):
+                book.popitem(-1)
+            self.lighter_best_ask = book.peekitem(0)[0] if book else None
+
+        # Levels beyond _depth_k were discarded, so a thinned-out side must be reloaded (see _depth_refill)
+        if self._lighter_book_truncated[side] and len(book) < self._depth_refill:
+            self.logger.warning(f"⚠️ Lighter {side} thinned to {len(book)} levels after pruning, requesting fresh snapshot")
+            self.lighter_order_book_sequence_gap = True
+
+    def _levels_to_ticks(self, levels: list, is_bid: bool) -> SortedDict:
+        """Convert snapshot levels to a SortedDict of the best _depth_k price ticks -> size units in one vectorized pass."""
+        if not levels:
+            self._lighter_book_truncated["bids" if is_bid else "asks"] = False
+            return SortedDict()
+        # NumPy parses the decimal strings directly; rint absorbs float representation error like round()
+        raw = np.array([(level.price, level.size) for level in levels], dtype=np.float64)
+        ticks = np.rint(raw[:, 0] * self.price_multiplier).astype(np.int64)
+        sizes = np.rint(raw[:, 1] * self.base_amount_multiplier).astype(np.int64)
+        keep = sizes > 0
+        ticks = ticks[keep]
+        sizes = sizes[keep]
+        self._lighter_book_truncated["bids" if is_bid else "asks"] = len(ticks) > self._depth_k
+        if len(ticks) > self._depth_k:
+            # Best levels first (highest bids, lowest asks), then keep the top _depth_k
+            order = np.argsort(-ticks if is_bid else ticks, kind='stable')[:self._depth_k]
+            ticks = ticks[order]
+            sizes = sizes[order]
+        return SortedDict(zip(ticks.tolist(), sizes.tolist()))
+
+    def _load_snapshot(self, bids: list, asks: list):
+        """Replace the Lighter order book from a full snapshot and refresh the cached best prices."""
+        self.lighter_order_book["bids"] = bid_book = self._levels_to_ticks(bids, True)
+        self.lighter_order_book["asks"] = ask_book = self._levels_to_ticks(asks, False)
+        self.lighter_best_bid = bid_book.peekitem(-1)[0] if bid_book else None
+        self.lighter_best_ask = ask_book.peekitem(0)[0] if ask_book else None
 
     def validate_order_book_offset(self, new_offset: int) -> bool:
         """Validate order book offset sequence."""
@@ -476,41 +679,38 @@ class HedgeBot:
         best_bid = None
         best_ask = None
 
+        # Books are sorted by price tick: best bid is the last key, best ask the first
         if self.lighter_order_book["bids"]:
-            best_bid_price = max(self.lighter_order_book["bids"].keys())
-            best_bid_size = self.lighter_order_book["bids"][best_bid_price]
-            best_bid = (best_bid_price, best_bid_size)
+            price_tick, size = self.lighter_order_book["bids"].peekitem(-1)
+            best_bid = (Decimal(price_tick) / self.price_multiplier, Decimal(size) / self.base_amount_multiplier)
 
         if self.lighter_order_book["asks"]:
-            best_ask_price = min(self.lighter_order_book["asks"].keys())
-            best_ask_size = self.lighter_order_book["asks"][best_ask_price]
-            best_ask = (best_ask_price, best_ask_size)
+            price_tick, size = self.lighter_order_book["asks"].peekitem(0)
+            best_ask = (Decimal(price_tick) / self.price_multiplier, Decimal(size) / self.base_amount_multiplier)
 
         return best_bid, best_ask
 
     def get_lighter_mid_price(self) -> Decimal:
         """Get mid price from Lighter order book."""
-        best_bid, best_ask = self.get_lighter_best_levels()
-
-        if best_bid is None or best_ask is None:
+        if self.lighter_best_bid is None or self.lighter_best_ask is None:
             raise Exception("Cannot calculate mid price - missing order book data")
 
-        mid_price = (best_bid[0] + best_ask[0]) / Decimal('2')
+        mid_price = Decimal(self.lighter_best_bid + self.lighter_best_ask) / (2 * self.price_multiplier)
         return mid_price
 
     def get_lighter_order_price(self, is_ask: bool) -> Decimal:
         """Get order price from Lighter order book."""
-        best_bid, best_ask = self.get_lighter_best_levels()
-
-        if best_bid is None or best_ask is None:
+        if self.lighter_best_bid is None or self.lighter_best_ask is None:
             raise Exception("Cannot calculate order price - missing order book data")
 
+        # Work in price ticks and convert to Decimal once, for the signed order
+        offset_ticks = int(self._TICK_OFFSET * self.price_multiplier)
         if is_ask:
-            order_price = best_bid[0] + Decimal('0.1')
+            order_price_tick = self.lighter_best_bid + offset_ticks
         else:
-            order_price = best_ask[0] - Decimal('0.1')
+            order_price_tick = self.lighter_best_ask - offset_ticks
 
-        return order_price
+        return Decimal(order_price_tick) / self.price_multiplier
 
     def calculate_adjusted_price(self, original_price: Decimal, side: str, adjustment_percent: Decimal) -> Decimal:
         """Calculate adjusted price for order modification."""
@@ -523,24 +723,118 @@ class HedgeBot:
             # For sell orders, decrease price to improve fill probability
             return original_price - adjustment
 
-    async def request_fresh_snapshot(self, ws):
-        """Request fresh order book snapshot."""
+    async def _subscribe_lighter_order_book(self, ws):
+        """Subscribe to order book updates; the server answers with a subscribed/order_book snapshot."""
         await ws.send(json.dumps({"type": "subscribe", "channel": f"order_book/{self.lighter_market_index}"}))
 
+    async def request_fresh_snapshot(self, ws):
+        """Request fresh order book snapshot by resubscribing on the open connection."""
+        await ws.send(json.dumps({"type": "unsubscribe", "channel": f"order_book/{self.lighter_market_index}"}))
+        await self._subscribe_lighter_order_book(ws)
+
+    async def _lighter_ws_watchdog(self, ws, stale_after: float = 30.0, check_every: float = 3.0):
+        """Close the Lighter socket once no frame has arrived for stale_after seconds, so handle_lighter_ws reconnects."""
+        while not self.stop_flag:
+            await asyncio.sleep(check_every)
+            idle = time.monotonic() - self.lighter_ws_last_msg_ts
+            if idle >= stale_after:
+                self.logger.warning(f"⏰ Lighter websocket stale for {idle:.1f} seconds, reconnecting...")
+                await ws.close()
+                return
+            if idle >= check_every:
+                self.logger.warning(f"⏰ No message from Lighter websocket for {idle:.1f} seconds")
+
+    # Lighter WS message handlers, dispatched by message type from handle_lighter_ws. Each returns False when
+    # the connection should be dropped and re-established. Single writer: handle_lighter_ws is the only coroutine
+    # that mutates the book and no handler awaits mid-update, so no lock is needed; readers use the cached
+    # lighter_best_bid/lighter_best_ask scalars.
+
+    async def _on_lighter_snapshot(self, data: _LighterMessage, ws) -> bool:
+        """Replace the order book from a subscribed/order_book snapshot."""
+        order_book = data.order_book or _LighterOrderBook()
+        if order_book.offset is not None:
+            self.lighter_order_book_offset = order_book.offset
+            self.logger.info(f"✅ Initial order book offset set to: {self.lighter_order_book_offset}")
+
+        # Debug: Log the structure of bids and asks
+        bids = order_book.bids
+        asks = order_book.asks
+        if bids:
+            self.logger.debug(f"📊 Sample bid structure: {bids[0] if bids else 'None'}")
+        if asks:
+            self.logger.debug(f"📊 Sample ask structure: {asks[0] if asks else 'None'}")
+
+        self._load_snapshot(bids, asks)
+        self.lighter_snapshot_loaded = True
+        self.lighter_order_book_ready = True
+
+        self.logger.info(f"✅ Lighter order book snapshot loaded with "
+                         f"{len(self.lighter_order_book['bids'])} bids and "
+                         f"{len(self.lighter_order_book['asks'])} asks")
+        return True
+
+    async def _on_lighter_book_update(self, data: _LighterMessage, ws) -> bool:
+        """Apply an update/order_book delta."""
+        if not self.lighter_snapshot_loaded:
+            # Ignore updates until we have the initial snapshot
+            return True
+
+        # Extract offset from the message
+        order_book = data.order_book
+        if order_book is None or order_book.offset is None:
+            self.logger.warning("⚠️ Order book update missing offset, skipping")
+            return True
+
+        new_offset = order_book.offset
+
+        # Validate offset sequence; a gap is recovered by resubscribing, not reconnecting
+        if not self.validate_order_book_offset(new_offset):
+            self.lighter_order_book_sequence_gap = True
+            return True
+
+        # Update the order book with new data; this always runs so the best prices stay current for a hedge
+        self.update_lighter_order_book("bids", order_book.bids)
+        self.update_lighter_order_book("asks", order_book.asks)
+
+        # Validate order book integrity after update, only while a hedge is pending (idle deltas skip the scan)
+        # (lighter_best_bid/lighter_best_ask were refreshed by update_lighter_order_book)
+        if self.waiting_for_lighter_fill and not self.validate_order_book_integrity():
+            self.logger.warning("🔄 Order book integrity check failed, requesting fresh snapshot...")
+            self.lighter_order_book_sequence_gap = True
+        return True
+
+    async def _on_lighter_ping(self, data: _LighterMessage, ws) -> bool:
+        """Respond to ping with pong."""
+        await ws.send(json.dumps({"type": "pong"}))
+        return True
+
+    async def _on_lighter_account_orders(self, data: _LighterMessage, ws) -> bool:
+        """Handle account orders updates."""
+        orders = data.orders.get(str(self.lighter_market_index), [])
+        for order in orders:
+            if order.get("status") == "filled":
+                self.handle_lighter_order_result(order)
+        return True
+
     async def handle_lighter_ws(self):
         """Handle Lighter WebSocket connection and messages."""
         url = "wss://mainnet.zklighter.elliot.ai/stream"
         cleanup_counter = 0
 
         while not self.stop_flag:
-            timeout_count = 0
+            watchdog_task = None
             try:
                 # Reset order book state before connecting
                 await self.reset_lighter_order_book()
 
-                async with websockets.connect(url) as ws:
+                # Library keepalive pings detect a dead peer and the watchdog closes a silent one, so reads
+                # block without a per-frame timeout; shutdown() cancels this task to interrupt them
+                async with websockets.connect(url, ping_interval=20, ping_timeout=10, max_queue=2**14) as ws:
+                    self.lighter_ws_last_msg_ts = time.monotonic()
+                    watchdog_task = asyncio.create_task(self._lighter_ws_watchdog(ws))
+
                     # Subscribe to order book updates
-                    await ws.send(json.dumps({"type": "subscribe", "channel": f"order_book/{self.lighter_market_index}"}))
+                    await self._subscribe_lighter_order_book(ws)
 
                     # Subscribe to account orders updates
                     account_orders_channel = f"account_orders/{self.lighter_market_index}/{self.account_index}"
@@ -550,114 +844,36 @@ class HedgeBot:
 
                     while not self.stop_flag:
                         try:
-                            # 更頻繁檢查停止信號
-                            msg = await asyncio.wait_for(ws.recv(), timeout=0.5)  # 減少超時時間
+                            msg = await ws.recv()
+                            self.lighter_ws_last_msg_ts = time.monotonic()
 
                             try:
-                                data = json.loads(msg)
-                            except json.JSONDecodeError as e:
+                                data = _decode_lighter(msg)
+                            except msgspec.DecodeError as e:  # includes schema ValidationError
                                 self.logger.warning(f"⚠️ JSON parsing error in Lighter websocket: {e}")
                                 continue
 
-                            # Reset timeout counter on successful message
-                            timeout_count = 0
-
-                            async with self.lighter_order_book_lock:
-                                if data.get("type") == "subscribed/order_book":
-                                    # Initial snapshot - clear and populate the order book
-                                    self.lighter_order_book["bids"].clear()
-                                    self.lighter_order_book["asks"].clear()
-
-                                    # Handle the initial snapshot
-                                    order_book = data.get("order_book", {})
-                                    if order_book and "offset" in order_book:
-                                        self.lighter_order_book_offset = order_book["offset"]
-                                        self.logger.info(f"✅ Initial order book offset set to: {self.lighter_order_book_offset}")
-
-                                    # Debug: Log the structure of bids and asks
-                                    bids = order_book.get("bids", [])
-                                    asks = order_book.get("asks", [])
-                                    if bids:
-                                        self.logger.debug(f"📊 Sample bid structure: {bids[0] if bids else 'None'}")
-                                    if asks:
-                                        self.logger.debug(f"📊 Sample ask structure: {asks[0] if asks else 'None'}")
-
-                                    self.update_lighter_order_book("bids", bids)
-                                    self.update_lighter_order_book("asks", asks)
-                                    self.lighter_snapshot_loaded = True
-                                    self.lighter_order_book_ready = True
-
-                                    self.logger.info(f"✅ Lighter order book snapshot loaded with "
-                                                     f"{len(self.lighter_order_book['bids'])} bids and "
-                                                     f"{len(self.lighter_order_book['asks'])} asks")
-
-                                elif data.get("type") == "update/order_book" and self.lighter_snapshot_loaded:
-                                    # Extract offset from the message
-                                    order_book = data.get("order_book", {})
-                                    if not order_book or "offset" not in order_book:
-                                        self.logger.warning("⚠️ Order book update missing offset, skipping")
-                                        continue
-
-                                    new_offset = order_book["offset"]
-
-                                    # Validate offset sequence
-                                    if not self.validate_order_book_offset(new_offset):
-                                        self.lighter_order_book_sequence_gap = True
-                                        break
-
-                                    # Update the order book with new data
-                                    self.update_lighter_order_book("bids", order_book.get("bids", []))
-                                    self.update_lighter_order_book("asks", order_book.get("asks", []))
-
-                                    # Validate order book integrity after update
-                                    if not self.validate_order_book_integrity():
-                                        self.logger.warning("🔄 Order book integrity check failed, requesting fresh snapshot...")
-                                        break
-
-                                    # Get the best bid and ask levels
-                                    best_bid, best_ask = self.get_lighter_best_levels()
-
-                                    # Update global variables
-                                    if best_bid is not None:
-                                        self.lighter_best_bid = best_bid[0]
-                                    if best_ask is not None:
-                                        self.lighter_best_ask = best_ask[0]
-
-                                elif data.get("type") == "ping":
-                                    # Respond to ping with pong
-                                    await ws.send(json.dumps({"type": "pong"}))
-                                elif data.get("type") == "update/account_orders":
-                                    # Handle account orders updates
-                                    orders = data.get("orders", {}).get(str(self.lighter_market_index), [])
-                                    for order in orders:
-                                        if order.get("status") == "filled":
-                                            self.handle_lighter_order_result(order)
-                                elif data.get("type") == "update/order_book" and not self.lighter_snapshot_loaded:
-                                    # Ignore updates until we have the initial snapshot
-                                    continue
-
-                            # Periodic cleanup outside the lock
+                            # One hash lookup routes the frame; a handler returns False to drop the connection
+                            handler = self._lighter_ws_handlers.get(data.type)
+                            if handler is not None and not await handler(data, ws):
+                                break
+
+                            # Periodic cleanup
                             cleanup_counter += 1
                             if cleanup_counter >= 1000:
                                 cleanup_counter = 0
 
-                            # Handle sequence gap and integrity issues outside the lock
+                            # Handle sequence gap and integrity issues on the same connection: deltas are
+                            # ignored until the resubscribe's snapshot replaces the book
                             if self.lighter_order_book_sequence_gap:
                                 try:
+                                    self.lighter_snapshot_loaded = False
                                     await self.request_fresh_snapshot(ws)
                                     self.lighter_order_book_sequence_gap = False
                                 except Exception as e:
                                     self.logger.error(f"⚠️ Failed to request fresh snapshot: {e}")
                                     break
 
-                        except asyncio.TimeoutError:
-                            timeout_count += 1
-                            if timeout_count % 6 == 0:  # 每3秒警告一次（0.5s * 6）
-                                self.logger.warning(f"⏰ No message from Lighter websocket for {timeout_count * 0.5:.1f} seconds")
-                            # 檢查停止信號
-                            if self.stop_flag:
-                                break
-                            continue
                         except websockets.exceptions.ConnectionClosed as e:
                             self.logger.warning(f"⚠️ Lighter websocket connection closed: {e}")
                             break
@@ -665,19 +881,26 @@ class HedgeBot:
                             self.logger.warning(f"⚠️ Lighter websocket error: {e}")
                             break
                         except Exception as e:
-                            self.logger.error(f"⚠️ Error in Lighter websocket: {e}")
-                            self.logger.error(f"⚠️ Full traceback: {traceback.format_exc()}")
+                            self.logger.exception(f"⚠️ Error in Lighter websocket: {e}")
                             break
             except Exception as e:
                 self.logger.error(f"⚠️ Failed to connect to Lighter websocket: {e}")
+            finally:
+                if watchdog_task is not None:
+                    watchdog_task.cancel()
 
             # Wait a bit before reconnecting
             await asyncio.sleep(2)
 
     def setup_signal_handlers(self):
-        """Setup signal handlers for graceful shutdown."""
-        signal.signal(signal.SIGINT, self.shutdown)
-        signal.signal(signal.SIGTERM, self.shutdown)
+        """Setup signal handlers for graceful shutdown, run on the event loop where supported."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.shutdown)
+            except NotImplementedError:
+                # Windows event loops have no add_signal_handler
+                signal.signal(sig, self.shutdown)
 
     async def initialize_lighter_client(self):
         """Initialize the Lighter client."""
@@ -740,7 +963,7 @@ class HedgeBot:
         headers = {"accept": "application/json"}
 
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self._http.get(url, headers=headers, timeout=10)
             response.raise_for_status()
 
             if not response.text.strip():
@@ -789,7 +1012,7 @@ class HedgeBot:
         """Round price to tick size."""
         if self.grvt_tick_size is None:
             return price
-        return (price / self.grvt_tick_size).quantize(Decimal('1')) * self.grvt_tick_size
+        return (price / self.grvt_tick_size).quantize(self._ONE) * self.grvt_tick_size
 
     async def place_bbo_order(self, side: str, quantity: Decimal):
         # Place the order using GRVT client
@@ -803,13 +1026,13 @@ class HedgeBot:
             if side.lower() == 'buy':
                 # For buy orders, price must be BELOW best ask (inside spread)
                 # Use tick size to ensure we're just inside the spread
-                tick_adjustment = self.grvt_tick_size if self.grvt_tick_size else Decimal('0.01')
+                tick_adjustment = self.grvt_tick_size if self.grvt_tick_size else self._DEFAULT_TICK
                 order_price = best_ask - tick_adjustment
                 self.logger.info(f"💰 BUY Order Price: {order_price} (Best Ask: {best_ask} - {tick_adjustment})")
             else:
                 # For sell orders, price must be ABOVE best bid (inside spread)
                 # Use tick size to ensure we're just inside the spread
-                tick_adjustment = self.grvt_tick_size if self.grvt_tick_size else Decimal('0.01')
+                tick_adjustment = self.grvt_tick_size if self.grvt_tick_size else self._DEFAULT_TICK
                 order_price = best_bid + tick_adjustment
                 self.logger.info(f"💰 SELL Order Price: {order_price} (Best Bid: {best_bid} + {tick_adjustment})")
             
@@ -846,14 +1069,21 @@ class HedgeBot:
 
     async def wait_for_grvt_order_with_ws(self, order_id: str, side: str, quantity: Decimal, wait_duration: int) -> bool:
         """等待 GRVT 訂單成交，優先使用 WebSocket，必要時才查詢 API"""
-        start_time = time.time()
-        check_interval = 1  # 每秒檢查一次
-        last_ws_check_time = self.grvt_ws_last_message_time
-        
-        for i in range(wait_duration):
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        deadline = start_time + wait_duration
+        check_interval = 1  # WS 活躍度/API 備援每秒檢查一次；WS 訂單更新會立即喚醒
+
+        while True:
             # 1. 優先檢查緩存（WebSocket 更新）
+            self.grvt_order_event.clear()
             if await self.check_order_filled_from_cache(order_id):
                 return True
+
+            remaining = deadline - loop.time()
+            if remaining <= 0 or self.stop_flag:
+                return False
+            i = int(loop.time() - start_time)
             
             # 2. 檢查 WebSocket 是否活躍
             if self.grvt_ws_connected:
@@ -865,31 +1095,25 @@ class HedgeBot:
                     self.logger.warning(f"⚠️ WebSocket seems inactive (no message for {time.time() - self.grvt_ws_last_message_time:.1f}s)")
                     self.grvt_ws_connected = False
             else:
-                # WebSocket 斷線，只在間隔時間後才查詢 API
-                current_time = time.time()
-                if current_time - self.last_api_query_time >= self.api_query_interval:
-                    self.logger.warning(f"⚠️ WebSocket disconnected, querying API (last query: {current_time - self.last_api_query_time:.1f}s ago)")
-                    try:
-                        position_after = await self.get_grvt_actual_position()
-                        self.last_api_query_time = current_time
-                        
-                        # 檢查持倉變化
-                        position_change = abs(position_after - self.grvt_position)
-                        if position_change >= Decimal('0.001'):
-                            self.logger.info(f"✅ Order detected as filled via API position check")
-                            return True
-                    except Exception as e:
-                        self.logger.error(f"❌ Error querying GRVT position: {e}")
-                else:
-                    if i % 5 == 0:
-                        self.logger.info(f"⏰ Waiting... {i+1}/{wait_duration}s (WS down, API cooldown)")
-            
-            await asyncio.sleep(check_interval)
-            
-            if self.stop_flag:
-                return False
-        
-        return False
+                # WebSocket 斷線，查詢 API（由 grvt_rate_limiter 限速）
+                if i % 5 == 0:
+                    self.logger.warning(f"⚠️ WebSocket disconnected, querying API... {i+1}/{wait_duration}s")
+                try:
+                    position_after = await self.get_grvt_actual_position(use_cache=False)
+
+                    # 檢查持倉變化
+                    position_change = abs(position_after - self.grvt_position)
+                    if position_change >= Decimal('0.001'):
+                        self.logger.info(f"✅ Order detected as filled via API position check")
+                        return True
+                except Exception as e:
+                    self.logger.error(f"❌ Error querying GRVT position: {e}")
+
+            # Block until the WS handler reports an order update or the next check is due
+            try:
+                await asyncio.wait_for(self.grvt_order_event.wait(), timeout=min(check_interval, remaining))
+            except asyncio.TimeoutError:
+                pass
 
     async def place_grvt_post_only_order(self, side: str, quantity: Decimal):
         """Place a post-only order on GRVT with optimized monitoring."""
@@ -915,7 +1139,7 @@ class HedgeBot:
                 # 初始化訂單緩存
                 self.grvt_order_cache[order_id] = {
                     'status': 'OPEN',
-                    'filled_size': Decimal('0'),
+                    'filled_size': self._ZERO,
                     'side': side,
                     'price': order_price,
                     'update_time': time.time()
@@ -948,7 +1172,7 @@ class HedgeBot:
                 else:
                     # WebSocket 未確認，查詢 API 確認
                     self.logger.info(f"❓ WebSocket did not confirm fill, checking API...")
-                    position_after = await self.get_grvt_actual_position()
+                    position_after = await self.get_grvt_actual_position(use_cache=False)
                     position_change = position_after - position_before
                     filled_size = abs(position_change)
                     order_filled = filled_size >= Decimal('0.001')
@@ -980,7 +1204,8 @@ class HedgeBot:
                         if lighter_result.success:
                             self.logger.info(f"✅ Lighter hedge order placed successfully: {lighter_result.order_id}")
                             
-                            # 更新內部 Lighter 持倉狀態
+                            # 更新內部 Lighter 持倉狀態（快取的持倉已過時）
+                            self._position_cache.clear()
                             if lighter_side.lower() == 'sell':
                                 self.lighter_position -= filled_size
                             else:
@@ -990,9 +1215,7 @@ class HedgeBot:
                         else:
                             self.logger.error(f"❌ Failed to place Lighter hedge order: {lighter_result.error_message}")
                     except Exception as e:
-                        self.logger.error(f"❌ Error placing Lighter hedge order: {e}")
-                        import traceback
-                        self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+                        self.logger.exception(f"❌ Error placing Lighter hedge order: {e}")
                     
                     # 設置執行完成標誌
                     self.order_execution_complete = True
@@ -1009,9 +1232,7 @@ class HedgeBot:
                     
             except Exception as e:
                 retry_count += 1
-                self.logger.error(f"❌ Error placing order (attempt {retry_count}): {e}")
-                import traceback
-                self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+                self.logger.exception(f"❌ Error placing order (attempt {retry_count}): {e}")
                 if retry_count < max_retries:
                     await asyncio.sleep(2)
                 else:
@@ -1044,6 +1265,9 @@ class HedgeBot:
         
         # 立即設置執行完成標誌，避免等待持倉變化檢測
         self.order_execution_complete = True
+
+        # 成交後持倉會短暫不一致，快照立即恢復最短間隔
+        self.expedite_position_snapshot()
         
         self.logger.info(f"🎯 GRVT WebSocket order filled! Triggering immediate Lighter {lighter_side} hedge...")
         
@@ -1089,9 +1313,7 @@ class HedgeBot:
             return snapshot
             
         except Exception as e:
-            self.logger.error(f"❌ Error taking position snapshot: {e}")
-            import traceback
-            self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+            self.logger.exception(f"❌ Error taking position snapshot: {e}")
             return None
 
     async def check_and_take_snapshot(self):
@@ -1099,7 +1321,17 @@ class HedgeBot:
         current_time = time.time()
         if current_time - self.last_snapshot_time >= self.position_snapshot_interval:
             self.last_snapshot_time = current_time
-            await self.take_position_snapshot()
+            snapshot = await self.take_position_snapshot()
+            if snapshot is not None and snapshot['is_hedged']:
+                self.position_snapshot_interval = min(self.position_snapshot_interval * 1.5,
+                                                      self.position_snapshot_interval_max)
+            else:
+                self.position_snapshot_interval = self.position_snapshot_interval_min
+
+    def expedite_position_snapshot(self):
+        """Make the next check_and_take_snapshot run immediately at the shortest interval (e.g. after a fill)."""
+        self.position_snapshot_interval = self.position_snapshot_interval_min
+        self.last_snapshot_time = 0
 
     def get_next_action(self) -> tuple[str, Decimal]:
         """決定下一步動作：建倉或平倉
@@ -1238,12 +1470,12 @@ class HedgeBot:
             order_type = "CLOSE"
             is_ask = False
             # For buy market order, use price significantly above best ask to ensure immediate fill
-            price = best_ask[0] * Decimal('1.01')  # 1% above best ask
+            price = best_ask[0] * self._SLIP_UP  # 1% above best ask
         else:
             order_type = "OPEN"
             is_ask = True
             # For sell market order, use price significantly below best bid to ensure immediate fill
-            price = best_bid[0] * Decimal('0.99')  # 1% below best bid
+            price = best_bid[0] * self._SLIP_DOWN  # 1% below best bid
 
 
         # Reset order state
@@ -1286,22 +1518,22 @@ class HedgeBot:
 
     async def monitor_lighter_order(self, client_order_index: int):
         """Monitor Lighter order with REST API fallback."""
-        start_time = time.time()
-        last_query_time = start_time
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
         query_interval = 1.0  # 每 1 秒主動查詢一次
+        next_query_time = start_time + query_interval
         max_wait_time = 10  # 最多等待 10 秒
-        
+        deadline = start_time + max_wait_time
+
         while not self.lighter_order_filled and not self.stop_flag:
-            elapsed_time = time.time() - start_time
-            current_time = time.time()
-            
             # 每 1 秒主動查詢訂單狀態（不依賴 WebSocket）
-            if current_time - last_query_time >= query_interval:
+            if loop.time() >= next_query_time:
                 try:
                     from lighter.api.order_api import OrderApi
                     order_api = OrderApi(self.lighter_client.api_client)
                     
                     # 查詢特定訂單
+                    await self.lighter_rate_limiter.acquire()
                     order_response = await order_api.order(
                         by="client_order_id",
                         value=str(client_order_index)
@@ -1321,15 +1553,15 @@ class HedgeBot:
                             })
                             break
                     
-                    last_query_time = current_time
                     self.logger.debug(f"🔍 Queried Lighter order {client_order_index} status via REST API")
-                    
+
                 except Exception as e:
                     self.logger.debug(f"⚠️ Error querying Lighter order status: {e}")
-                    last_query_time = current_time
-            
+                next_query_time = loop.time() + query_interval
+
             # Check for timeout
-            if elapsed_time > max_wait_time:
+            elapsed_time = loop.time() - start_time
+            if elapsed_time >= max_wait_time:
                 self.logger.error(f"❌ Timeout waiting for Lighter order fill after {elapsed_time:.1f}s")
                 self.logger.warning("⚠️ Assuming order filled (will be verified by position monitor)")
                 
@@ -1347,7 +1579,16 @@ class HedgeBot:
                 self.order_execution_complete = True
                 break
 
-            await asyncio.sleep(0.1)  # Check every 100ms
+            # Block until a fill is handled (handle_lighter_order_result sets the event),
+            # the next REST query is due, or the deadline passes
+            self.lighter_order_event.clear()
+            if self.lighter_order_filled:
+                break
+            try:
+                await asyncio.wait_for(self.lighter_order_event.wait(),
+                                       timeout=max(0.0, min(next_query_time, deadline) - loop.time()))
+            except asyncio.TimeoutError:
+                pass
 
     async def modify_lighter_order(self, client_order_index: int, new_price: Decimal):
         """Modify current Lighter order with new price using client_order_index."""
@@ -1380,9 +1621,7 @@ class HedgeBot:
                              f"{self.lighter_order_size} @ {new_price}")
 
         except Exception as e:
-            self.logger.error(f"❌ Error modifying Lighter order: {e}")
-            import traceback
-            self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+            self.logger.exception(f"❌ Error modifying Lighter order: {e}")
 
     async def monitor_grvt_websocket(self):
         """監控 GRVT WebSocket 連接狀態並自動重連"""
@@ -1455,6 +1694,7 @@ class HedgeBot:
                     'price': price,
                     'update_time': time.time()
                 }
+                self.grvt_order_event.set()
 
                 if side == 'buy':
                     order_type = "OPEN"
@@ -1466,6 +1706,7 @@ class HedgeBot:
 
                 # Handle the order update
                 if status == 'FILLED' and self.grvt_order_status != 'FILLED':
+                    self._position_cache.clear()  # cached REST positions predate this fill
                     if side == 'buy':
                         self.grvt_position += filled_size
                     else:
@@ -1636,8 +1877,7 @@ class HedgeBot:
             try:
                 side, quantity = self.get_next_action()
             except Exception as e:
-                self.logger.error(f"❌ Error in strategy decision: {e}")
-                self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+                self.logger.exception(f"❌ Error in strategy decision: {e}")
                 break
 
             # 重置訂單狀態
@@ -1648,8 +1888,7 @@ class HedgeBot:
             try:
                 await self.place_grvt_post_only_order(side, quantity)
             except Exception as e:
-                self.logger.error(f"⚠️ Error placing GRVT order: {e}")
-                self.logger.error(f"⚠️ Full traceback: {traceback.format_exc()}")
+                self.logger.exception(f"⚠️ Error placing GRVT order: {e}")
                 # 不中斷循環，繼續下一次迭代
                 continue
 
@@ -1697,15 +1936,14 @@ class HedgeBot:
     async def run(self):
         """Run the hedge bot."""
         self.setup_signal_handlers()
+        self._csv_flusher_task = asyncio.create_task(self._csv_flusher())
 
         try:
             await self.trading_loop()
         except KeyboardInterrupt:
             self.logger.info("\n🛑 Received interrupt signal...")
         except Exception as e:
-            self.logger.error(f"❌ Unexpected error: {e}")
-            import traceback
-            self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+            self.logger.exception(f"❌ Unexpected error: {e}")
         finally:
             self.logger.info("🔄 Cleaning up...")
             
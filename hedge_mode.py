@@ -150,4 +150,15 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Prefer libuv-based event loops when available; the hedge bots are loop-agnostic
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        try:
+            import winloop
+            winloop.install()
+        except ImportError:
+            pass
+
     sys.exit(asyncio.run(main()))
\ No newline at end of file
@@ -3,5 +3,6 @@ Helper modules for perp-dex-tools.
 """
 
 from .logger import TradingLogger
+from .log_formatter import CachedTimeFormatter
 
-__all__ = ['TradingLogger']
+__all__ = ['TradingLogger', 'CachedTimeFormatter']
@@ -0,0 +1,26 @@
+"""
+Logging formatter that caches the rendered timestamp per wall-clock second.
+"""
+
+import logging
+import time
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that only re-renders %(asctime)s when the wall-clock second changes.
+
+    The cache is unsynchronized: give each QueueListener (one thread) its own instances
+    instead of sharing one formatter across threads.
+    """
+
+    def __init__(self, fmt=None, datefmt=None):
+        super().__init__(fmt=fmt, datefmt=datefmt)
+        self._last_sec = None
+        self._cached = ''
+
+    def formatTime(self, record, datefmt=None):
+        sec = int(record.created)
+        if sec != self._last_sec:
+            self._cached = time.strftime(datefmt or self.default_time_format, self.converter(sec))
+            self._last_sec = sec
+        return self.default_msec_format % (self._cached, record.msecs)